@@ -10,12 +10,21 @@ API_KEY = os.getenv("BINANCE_API_KEY", "").strip()
 API_SECRET = os.getenv("BINANCE_API_SECRET", "").strip()
 USE_TESTNET = os.getenv("USE_TESTNET", "True").lower() in ("true", "1", "yes")
 DRY_RUN = os.getenv("DRY_RUN", "False").lower() in ("true", "1", "yes")
+# Throttling agresivo de ccxt (~20 req/s). Más throughput, pero riesgo de ban de IP si se abusa.
+FAST_RATE_LIMIT = os.getenv("FAST_RATE_LIMIT", "False").lower() in ("true", "1", "yes")
+
+# --- Modo ---
+MODE = os.getenv("MODE", "paper").strip().lower()  # "paper" (simulado) o "live"
 
 # --- Trading / Risk ---
 DAILY_PROFIT_TARGET = float(os.getenv("DAILY_PROFIT_TARGET_USD", "50.0"))
+DAILY_PROFIT_TARGET_USD = DAILY_PROFIT_TARGET
+MAX_DAILY_LOSS_USD = float(os.getenv("MAX_DAILY_LOSS_USD", "25.0"))
+STARTING_BALANCE_USDT = float(os.getenv("STARTING_BALANCE_USDT", "1000.0"))  # equity inicial en paper
 MAX_INVESTMENT = float(os.getenv("MAX_INVESTMENT", "2000.0"))
 POSITION_SIZE_PERCENT = float(os.getenv("POSITION_SIZE_PERCENT", "0.01"))  # decimal (1% = 0.01)
 MAX_OPEN_TRADES = int(os.getenv("MAX_OPEN_TRADES", "5"))
+CAPITAL_MAX_USDT = float(os.getenv("CAPITAL_MAX_USDT", "2000.0"))  # tope de equity para sizing
 MIN_NOTIONAL_USD = float(os.getenv("MIN_NOTIONAL_USD", "10.0"))
 RISK_REWARD_RATIO = float(os.getenv("RISK_REWARD_RATIO", "1.5"))
 
@@ -31,6 +40,7 @@ HEDGE_MODE = os.getenv("HEDGE_MODE", "True").lower() in ("true", "1", "yes")
 # --- Universo y ciclo ---
 TIMEFRAME = os.getenv("TIMEFRAME", "1m")
 MAX_ACTIVE_SYMBOLS = int(os.getenv("MAX_ACTIVE_SYMBOLS", "5"))
+TOP_K_SELECTION = os.getenv("TOP_K_SELECTION", "True").lower() in ("true", "1", "yes")
 MAX_SYMBOLS = int(os.getenv("MAX_SYMBOLS", "15"))
 MIN_24H_VOLUME_USDT = float(os.getenv("MIN_24H_VOLUME_USDT", "5000000"))
 SLEEP_SECONDS_BETWEEN_CYCLES = int(os.getenv("SLEEP_SECONDS_BETWEEN_CYCLES", "5"))
@@ -39,12 +49,22 @@ DAILY_RESET_HOUR_UTC = int(os.getenv("DAILY_RESET_HOUR_UTC", "0"))
 # --- Telegram ---
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()
+# Webhook para comandos (URL pública HTTPS que llega a este puerto). Vacío = long-poll.
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL", "").strip()
+TELEGRAM_WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8443"))
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "").strip()
 
 # --- Logging / Misc ---
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Core al que se fija el proceso (Linux). Vacío = sin afinidad.
+BOT_CPU = int(os.getenv("BOT_CPU")) if os.getenv("BOT_CPU", "").strip() else None
 
 # --- Defaults / data dirs ---
 DATA_DIR = Path("data")
 LOGS_DIR = Path("logs")
 DATA_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
+DB_PATH = os.getenv("DB_PATH", str(DATA_DIR / "crypto_bot.db"))
+# caché en disco de velas de meses cerrados (src/fetcher.py, requiere diskcache)
+OHLCV_CACHE_DIR = os.getenv("OHLCV_CACHE_DIR", str(DATA_DIR / "ohlcv_cache"))
+OHLCV_CACHE_SIZE_MB = int(os.getenv("OHLCV_CACHE_SIZE_MB", "1024"))
@@ -3,6 +3,7 @@ Plan loader for YAML-based configuration management.
 Loads, validates, and provides runtime access to plan settings.
 """
 from __future__ import annotations
+import functools
 import os
 import logging
 import yaml
@@ -77,33 +78,33 @@ class PlanLoader:
         self._last_symbol_refresh: Optional[float] = None
 
     def load_plan(self) -> TradingPlan:
-        """Load and validate the trading plan from YAML file."""
+        """Load and validate the trading plan from YAML file.
+
+        Parsing is memoized in memory on (path, mtime), so within this process the YAML is
+        only re-read after the file is edited.
+        """
         if not os.path.exists(self.plan_path):
-            log.warning(f"Plan file {self.plan_path} not found, using defaults")
+            log.warning("Plan file %s not found, using defaults", self.plan_path)
             self._plan = TradingPlan()
             return self._plan
 
         try:
-            with open(self.plan_path, 'r') as f:
-                data = yaml.safe_load(f)
-            
-            if not data:
-                log.warning(f"Empty plan file {self.plan_path}, using defaults")
-                self._plan = TradingPlan()
-                return self._plan
-
-            self._plan = self._parse_plan(data)
-            self._validate_plan(self._plan)
-            log.info(f"Loaded plan '{self._plan.profile_name}' in mode '{self._plan.mode}'")
+            path = os.path.abspath(self.plan_path)
+            plan = _load_plan_file(path, os.stat(path).st_mtime_ns)
+            if plan is None:
+                log.warning("Empty plan file %s, using defaults", self.plan_path)
+                plan = TradingPlan()
+            self._plan = plan
             return self._plan
             
         except Exception as e:
-            log.error(f"Failed to load plan from {self.plan_path}: {e}")
+            log.error("Failed to load plan from %s: %s", self.plan_path, e)
             log.warning("Falling back to default plan")
             self._plan = TradingPlan()
             return self._plan
 
-    def _parse_plan(self, data: Dict[str, Any]) -> TradingPlan:
+    @staticmethod
+    def _parse_plan(data: Dict[str, Any]) -> TradingPlan:
         """Parse YAML data into TradingPlan objects."""
         # Parse universe config
         universe_data = data.get("universe", {})
@@ -177,7 +178,8 @@ class PlanLoader:
             alerts=alerts
         )
 
-    def _validate_plan(self, plan: TradingPlan) -> None:
+    @staticmethod
+    def _validate_plan(plan: TradingPlan) -> None:
         """Validate plan configuration values."""
         # Validate mode
         valid_modes = ["paper", "live_testnet", "live_mainnet"]
@@ -237,20 +239,20 @@ class PlanLoader:
         if plan.universe.mode == "static":
             # Return static symbols excluding any excluded ones
             symbols = [s for s in plan.universe.static_symbols if s not in plan.universe.exclude_symbols]
-            log.debug(f"Using static universe: {symbols}")
+            log.debug("Using static universe: %s", symbols)
             return symbols
         
         elif plan.universe.mode == "dynamic":
             # For now, return static symbols as fallback
             # Dynamic selection will be implemented in src/universe/selector.py
             symbols = [s for s in plan.universe.static_symbols if s not in plan.universe.exclude_symbols]
-            log.debug(f"Dynamic universe not yet implemented, using static fallback: {symbols}")
+            log.debug("Dynamic universe not yet implemented, using static fallback: %s", symbols)
             return symbols
         
         else:
             # Fallback to static symbols
             symbols = [s for s in plan.universe.static_symbols if s not in plan.universe.exclude_symbols]
-            log.warning(f"Unknown universe mode '{plan.universe.mode}', using static fallback: {symbols}")
+            log.warning("Unknown universe mode '%s', using static fallback: %s", plan.universe.mode, symbols)
             return symbols
 
     def get_sl_pct(self) -> float:
@@ -289,12 +291,26 @@ class PlanLoader:
         
         # If plan requests live mode but secrets are missing
         if plan.mode in ["live_testnet", "live_mainnet"] and (not api_key or not api_secret):
-            log.warning(f"Plan mode is '{plan.mode}' but API credentials are missing. Falling back to paper mode.")
+            log.warning("Plan mode is '%s' but API credentials are missing. Falling back to paper mode.", plan.mode)
             return True
         
         return False
 
 
+@functools.lru_cache(maxsize=4)
+def _load_plan_file(path: str, mtime_ns: int) -> Optional[TradingPlan]:
+    """Parsed + validated plan for this exact file version; None if the file is empty."""
+    with open(path, 'r') as f:
+        data = yaml.safe_load(f)
+    if not data:
+        return None
+
+    plan = PlanLoader._parse_plan(data)
+    PlanLoader._validate_plan(plan)
+    log.info("Loaded plan '%s' in mode '%s'", plan.profile_name, plan.mode)
+    return plan
+
+
 # Global instance for easy access
 _plan_loader: Optional[PlanLoader] = None
 
@@ -5,9 +5,13 @@ Wrapper robusto y asíncrono sobre ccxt.async_support.binance (USDT-M Futures).
 Incluye:
 - Inicialización segura (_ensure_exchange)
 - adjust_amount_to_step para roundear qty al stepSize del mercado
+- filtros de mercado (minQty/stepSize/minNotional/tickSize) cacheados al cargar markets
 - create_order con sanitización y retries (quita reduceOnly si falla, fallback de tipos)
 - fetch_trades_for_order para obtener fills asociados a un orderId
 - fetch_ohlcv / fetch_ticker / fetch_all_symbols / fetch_24h_change
+- fetch_all_last_prices / fetch_all_24h_changes (una sola llamada para todo el mercado)
+- fetch_usdt_perp_symbols (universo por volumen 24h) / fetch_balance_usdt
+- set_leverage / set_margin_mode por símbolo
 - cancel_order / fetch_order / fetch_open_orders
 - dry_run support (logs en lugar de enviar órdenes)
 """
@@ -15,13 +19,56 @@ import asyncio
 import logging
 import math
 import os
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, NamedTuple, Tuple
 
+import aiohttp
 import ccxt.async_support as ccxt
+import numpy as np
 from ccxt.base.errors import InvalidOrder
 
+from src.exchange.rate_limit import BinanceRateLimiter, kline_weight
+
 logger = logging.getLogger(__name__)
 
+# pool de conexiones HTTP: sockets keep-alive reutilizados entre llamadas REST
+HTTP_POOL_LIMIT = 20
+HTTP_KEEPALIVE_SEC = 60
+DNS_CACHE_TTL_SEC = 300
+
+
+class SymbolFilters(NamedTuple):
+    min_qty: float
+    step_size: float
+    min_notional: float
+    tick_size: float
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _market_filters(info: dict) -> SymbolFilters:
+    """Extrae (min_qty, step_size, min_notional, tick_size) de un market de ccxt; 0.0 = sin filtro."""
+    precision = info.get("precision", {}) or {}
+    limits = info.get("limits", {}) or {}
+    amt_lim = limits.get("amount", {}) or {}
+    step = _as_float(precision.get("amount")) if isinstance(precision, dict) else 0.0
+    if step <= 0:
+        for key in ("stepSize", "min", "step"):
+            step = _as_float(amt_lim.get(key))
+            if step > 0:
+                break
+    tick = _as_float(precision.get("price")) if isinstance(precision, dict) else 0.0
+    return SymbolFilters(
+        min_qty=_as_float(amt_lim.get("min")),
+        step_size=max(step, 0.0),
+        min_notional=_as_float((limits.get("cost", {}) or {}).get("min")),
+        tick_size=max(tick, 0.0),
+    )
+
 
 class BinanceClient:
     def __init__(
@@ -32,6 +79,7 @@ class BinanceClient:
         dry_run: bool = False,
         verbose: bool = False,
         hedge_mode: bool = True,
+        fast_rate_limit: bool = False,
     ):
         self.api_key = (api_key or os.getenv("API_KEY") or "").strip()
         self.api_secret = (api_secret or os.getenv("API_SECRET") or "").strip()
@@ -39,9 +87,23 @@ class BinanceClient:
         self.dry_run = dry_run or (os.getenv("DRY_RUN", "False").lower() in ("1", "true", "yes"))
         self.verbose = verbose
         self.hedge_mode = hedge_mode or (os.getenv("HEDGE_MODE", "False").lower() in ("1", "true", "yes"))
+        self.fast_rate_limit = fast_rate_limit or (os.getenv("FAST_RATE_LIMIT", "False").lower() in ("1", "true", "yes"))
 
         self.exchange: Optional[ccxt.binance] = None
+        self._session: Optional[aiohttp.ClientSession] = None
         self._initialized = False
+        # caps concurrent order-status REST calls so monitor loops can't pile up under throttling
+        self._rest_sem = asyncio.Semaphore(8)
+        # presupuesto por endpoint (peso/min por IP, órdenes/10s), sincronizado con las cabeceras X-MBX-*
+        self._limiter = BinanceRateLimiter()
+        # (order_id, symbol) -> in-flight fetch_order task shared by concurrent callers
+        self._inflight_orders: Dict[Tuple[str, Optional[str]], asyncio.Task] = {}
+        # filtros de mercado por símbolo (SoA): se rellenan una vez tras load_markets
+        self.filter_index: Dict[str, int] = {}
+        self.min_qty = np.zeros(0, dtype=np.float64)
+        self.step_size = np.zeros(0, dtype=np.float64)
+        self.min_notional = np.zeros(0, dtype=np.float64)
+        self.tick_size = np.zeros(0, dtype=np.float64)
 
     async def _ensure_exchange(self):
         if self._initialized and self.exchange:
@@ -56,6 +118,18 @@ class BinanceClient:
                 "adjustForTimeDifference": True,
             },
         }
+        # Una sola sesión keep-alive para todas las llamadas: evita el handshake TCP+TLS en
+        # sockets fríos. aiohttp ya activa TCP_NODELAY en cada conexión. Al pasarla por
+        # params ccxt no la considera suya y no la cierra; lo hace close().
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                ttl_dns_cache=DNS_CACHE_TTL_SEC,
+                keepalive_timeout=HTTP_KEEPALIVE_SEC,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, trust_env=True)
+        params["session"] = self._session
         # use testnet endpoints if requested
         if self.use_testnet:
             logger.info("Binance sandbox/testnet mode enabled (USDT-M futures). Using testnet endpoints.")
@@ -66,7 +140,20 @@ class BinanceClient:
                 }
             }
 
+        if self.fast_rate_limit:
+            # ~20 req/s instead of ccxt's default 500ms spacing. Still well below the FAPI
+            # budget (2400 weight/min) for weight-1 calls like fetch_order/fetch_balance, but a
+            # burst of heavy endpoints can get the IP banned, so it stays behind FAST_RATE_LIMIT.
+            # The throttler copies tokenBucket at construction, so it must go through params.
+            params["rateLimit"] = 50
+            params["tokenBucket"] = {"refillRate": 1.0 / 50, "delay": 0.001, "capacity": 1200, "defaultCost": 1.0}
+
+        # el JSON lo decodifica ccxt (con orjson si está instalado): no se sustituye parse_json,
+        # así se conservan sus reglas para números (Precise) en órdenes y balances
         self.exchange = ccxt.binance(params)
+        if self.fast_rate_limit:
+            throttle_cfg = getattr(getattr(self.exchange, "throttle", None), "config", None)
+            logger.info("Fast rate limit enabled: rateLimit=%sms throttle=%s", self.exchange.rateLimit, throttle_cfg or self.exchange.tokenBucket)
         if self.verbose:
             try:
                 self.exchange.verbose = True
@@ -82,20 +169,28 @@ class BinanceClient:
             await self.exchange.load_markets()
         except Exception as e:
             logger.warning("Warning loading markets for BinanceClient: %s", e)
+        self._build_symbol_filters()
 
         self._initialized = True
 
+    async def _call(self, endpoint: str, weight: float, fn, *args, **kwargs):
+        """Llamada REST a través del rate limiter (con reintentos ante 429/418)."""
+        return await self._limiter.call(self.exchange, endpoint, weight, fn, *args, **kwargs)
+
     async def close(self):
         try:
             if self.exchange:
                 await self.exchange.close()
         except Exception:
             logger.debug("Error closing exchange client", exc_info=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def fetch_all_symbols(self) -> List[str]:
         await self._ensure_exchange()
         try:
-            info = await self.exchange.fapiPublicGetExchangeInfo()
+            info = await self._call("market", 1, self.exchange.fapiPublicGetExchangeInfo)
             out: List[str] = []
             for s in info.get("symbols", []):
                 try:
@@ -129,14 +224,16 @@ class BinanceClient:
     async def fetch_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
         await self._ensure_exchange()
         try:
-            return await self.exchange.fetch_ticker(symbol)
+            return await self._call("market", 1, self.exchange.fetch_ticker, symbol)
         except Exception:
             return None
 
     async def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", since: Optional[int] = None, limit: int = 100):
         await self._ensure_exchange()
         try:
-            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+            ohlcv = await self._call(
+                "market", kline_weight(limit), self.exchange.fetch_ohlcv, symbol, timeframe=timeframe, since=since, limit=limit
+            )
             if not ohlcv:
                 return None
             # ensure numeric types
@@ -149,6 +246,100 @@ class BinanceClient:
         except Exception:
             return None
 
+    @staticmethod
+    def market_id(symbol: str) -> str:
+        """'BTC/USDT' (o 'BTC/USDT:USDT') -> 'BTCUSDT', el id que usa la API de Binance."""
+        return symbol.split(":")[0].replace("/", "").upper()
+
+    async def fetch_all_last_prices(self) -> Dict[str, float]:
+        """
+        Último precio de todos los perpetuos en una sola llamada (weight 2), indexado por
+        market id ('BTCUSDT'). Dict vacío si falla.
+        """
+        await self._ensure_exchange()
+        try:
+            rows = await self._call("market", 2, self.exchange.fapiPublicGetTickerPrice)
+        except Exception as e:
+            logger.warning("Bulk ticker price fetch failed: %s", e)
+            return {}
+        out: Dict[str, float] = {}
+        for row in rows or ():
+            try:
+                out[row["symbol"]] = float(row["price"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return out
+
+    async def fetch_all_24h_changes(self) -> Dict[str, float]:
+        """
+        |priceChangePercent| 24h de todos los perpetuos en una sola llamada (weight 40),
+        indexado por market id ('BTCUSDT'). Dict vacío si falla.
+        """
+        await self._ensure_exchange()
+        try:
+            rows = await self._call("market", 40, self.exchange.fapiPublicGetTicker24hr)
+        except Exception as e:
+            logger.warning("Bulk 24h ticker fetch failed: %s", e)
+            return {}
+        out: Dict[str, float] = {}
+        for row in rows or ():
+            try:
+                out[row["symbol"]] = abs(float(row["priceChangePercent"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return out
+
+    async def fetch_usdt_perp_symbols(self, min_volume: float = 0.0, max_symbols: Optional[int] = None) -> List[str]:
+        """
+        Perpetuos USDT en TRADING con quoteVolume 24h >= min_volume, de mayor a menor volumen
+        (una llamada de exchangeInfo y otra de ticker 24h para todo el mercado).
+        """
+        symbols = await self.fetch_all_symbols()
+        try:
+            rows = await self._call("market", 40, self.exchange.fapiPublicGetTicker24hr)
+        except Exception as e:
+            logger.warning("Bulk 24h ticker fetch failed: %s", e)
+            return symbols[:max_symbols] if max_symbols else symbols
+        volumes: Dict[str, float] = {}
+        for row in rows or ():
+            try:
+                volumes[row["symbol"]] = float(row["quoteVolume"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        ranked = [(volumes.get(self.market_id(s), 0.0), s) for s in symbols]
+        out = [s for vol, s in sorted(ranked, reverse=True) if vol >= min_volume]
+        return out[:max_symbols] if max_symbols else out
+
+    async def fetch_balance_usdt(self) -> float:
+        """Balance total de USDT de la cuenta de futuros (0.0 si falla)."""
+        await self._ensure_exchange()
+        try:
+            bal = await self._call("market", 5, self.exchange.fetch_balance)
+        except Exception as e:
+            logger.warning("fetch_balance failed: %s", e)
+            return 0.0
+        return _as_float((bal.get("total") or {}).get("USDT"))
+
+    async def set_leverage(self, symbol: str, leverage: int) -> Any:
+        await self._ensure_exchange()
+        if self.dry_run:
+            logger.info("DRY RUN set_leverage %s x%s", symbol, leverage)
+            return None
+        return await self._call("market", 1, self.exchange.set_leverage, leverage, symbol)
+
+    async def set_margin_mode(self, symbol: str, margin_mode: str) -> Any:
+        await self._ensure_exchange()
+        if self.dry_run:
+            logger.info("DRY RUN set_margin_mode %s %s", symbol, margin_mode)
+            return None
+        try:
+            return await self._call("market", 1, self.exchange.set_margin_mode, margin_mode.lower(), symbol)
+        except Exception as e:
+            # -4046 "No need to change margin type": ya estaba en ese modo
+            if "-4046" in str(e):
+                return None
+            raise
+
     async def fetch_24h_change(self, symbol: str) -> Optional[float]:
         ticker = await self.fetch_ticker(symbol)
         if not ticker:
@@ -163,56 +354,103 @@ class BinanceClient:
             return None
 
     async def fetch_order(self, order_id: str, symbol: Optional[str] = None) -> Optional[dict]:
+        """
+        fetch_order limitado por semáforo. Si otro caller ya está consultando la misma
+        (order_id, symbol), espera ese mismo resultado en lugar de gastar otro RTT.
+        """
         await self._ensure_exchange()
-        try:
-            return await self.exchange.fetch_order(order_id, symbol)
-        except Exception:
-            return None
+        key = (str(order_id), symbol)
+        task = self._inflight_orders.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_order_limited(order_id, symbol))
+            self._inflight_orders[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight_orders.pop(k, None))
+        # shield: cancelling one waiter must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_order_limited(self, order_id: str, symbol: Optional[str]) -> Optional[dict]:
+        async with self._rest_sem:
+            try:
+                return await self._call("market", 1, self.exchange.fetch_order, order_id, symbol)
+            except Exception:
+                return None
 
     async def fetch_open_orders(self, symbol: Optional[str] = None) -> List[dict]:
         await self._ensure_exchange()
         try:
-            return await self.exchange.fetch_open_orders(symbol)
+            return await self._call("market", 1 if symbol else 40, self.exchange.fetch_open_orders, symbol)
         except Exception:
             return []
 
+    def _build_symbol_filters(self):
+        """
+        Parsea los filtros de todos los mercados una sola vez. Cambian como mucho una vez
+        al día, así que adjust_amount_to_step/is_trade_feasible solo indexan arrays.
+        """
+        markets = getattr(self.exchange, "markets", None) or {}
+        rows = []
+        index: Dict[str, int] = {}
+        for sym, info in markets.items():
+            try:
+                rows.append(_market_filters(info or {}))
+            except Exception as e:
+                logger.debug("Could not parse filters for %s: %s", sym, e)
+                continue
+            index[sym] = len(rows) - 1
+        # el bot usa "BTC/USDT" y con defaultType future ccxt lo resuelve al perpetuo lineal
+        # ("BTC/USDT:USDT"), no al spot del mismo nombre: los filtros tienen que ser los suyos
+        for sym, info in markets.items():
+            if sym in index and (info or {}).get("swap") and (info or {}).get("linear"):
+                index[sym.split(":")[0]] = index[sym]
+        arr = np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+        self.min_qty, self.step_size, self.min_notional, self.tick_size = (np.ascontiguousarray(arr[:, i]) for i in range(4))
+        self.filter_index = index
+        logger.debug("Symbol filters cached for %d markets", len(index))
+
+    def get_symbol_filters(self, symbol: str) -> Optional[SymbolFilters]:
+        i = self.filter_index.get(symbol)
+        if i is None:
+            return None
+        return SymbolFilters(float(self.min_qty[i]), float(self.step_size[i]), float(self.min_notional[i]), float(self.tick_size[i]))
+
+    def is_trade_feasible(self, symbol: str, notional: float, price: float) -> bool:
+        """True si la orden cumple minNotional y minQty del mercado (símbolos sin filtros: True)."""
+        i = self.filter_index.get(symbol)
+        if i is None:
+            return True
+        if price <= 0:
+            return False
+        return notional >= self.min_notional[i] and notional / price >= self.min_qty[i]
+
+    def filter_rows(self, symbols: List[str]) -> np.ndarray:
+        """Fila de cada símbolo en los arrays de filtros (-1 = sin filtros); se calcula una vez por universo."""
+        return np.fromiter((self.filter_index.get(s, -1) for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def feasible_mask(self, rows: np.ndarray, notional: float, prices: np.ndarray) -> np.ndarray:
+        """is_trade_feasible para todo el universo de una vez (rows de filter_rows, prices alineados)."""
+        known = rows >= 0
+        if self.min_qty.size == 0 or not known.any():
+            return np.ones(rows.shape[0], dtype=bool)
+        r = np.where(known, rows, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ok = (prices > 0) & (notional >= self.min_notional[r]) & (notional / prices >= self.min_qty[r])
+        return ~known | ok
+
     def adjust_amount_to_step(self, symbol: str, amount: float) -> float:
         """
         Ajusta cantidad al stepSize/precision del mercado (round down).
         """
-        try:
-            if amount is None:
-                return 0.0
-            amount = float(amount)
-            if not self.exchange or not getattr(self.exchange, "markets", None):
-                return amount
-            info = self.exchange.markets.get(symbol)
-            if not info:
-                return amount
-            # Try to get amount precision
-            precision = info.get("precision", {}) or {}
-            step = None
-            if isinstance(precision, dict) and precision.get("amount") is not None:
-                step = float(precision.get("amount"))
-            else:
-                limits = info.get("limits", {}) or {}
-                amt_lim = limits.get("amount", {}) or {}
-                step = None
-                for key in ("stepSize", "min", "step"):
-                    if key in amt_lim and amt_lim.get(key):
-                        try:
-                            step = float(amt_lim.get(key))
-                            break
-                        except Exception:
-                            continue
-            if not step or step <= 0:
-                return amount
-            steps = math.floor(amount / step)
-            adjusted = float(steps * step) if steps > 0 else 0.0
-            return adjusted
-        except Exception as e:
-            logger.debug("adjust_amount_to_step failed for %s: %s", symbol, e)
+        if amount is None:
+            return 0.0
+        amount = float(amount)
+        i = self.filter_index.get(symbol)
+        if i is None:
+            return amount
+        step = self.step_size[i]
+        if step <= 0:
             return amount
+        steps = math.floor(amount / step)
+        return float(steps * step) if steps > 0 else 0.0
 
     async def create_order(self, symbol: str, type: str, side: str, amount: float, price: Optional[float] = None, params: Optional[Dict[str, Any]] = None) -> Any:
         """
@@ -261,7 +499,7 @@ class BinanceClient:
             params["positionSide"] = "LONG" if str(side).lower() in ("buy", "b", "long") else "SHORT"
 
         try:
-            return await self.exchange.create_order(symbol, type, side, amount, price, params or {})
+            return await self._call("order", 1, self.exchange.create_order, symbol, type, side, amount, price, params or {})
         except InvalidOrder as exc:
             msg = str(exc)
             logger.debug("create_order InvalidOrder for %s %s %s: %s", symbol, type, side, msg)
@@ -281,7 +519,7 @@ class BinanceClient:
                     params_retry.pop(k, None)
                 logger.warning("Order type %s rejected by exchange for %s -> retrying with %s (sanitized params)", type, symbol, new_type)
                 try:
-                    return await self.exchange.create_order(symbol, new_type, side, amount, price, params_retry or {})
+                    return await self._call("order", 1, self.exchange.create_order, symbol, new_type, side, amount, price, params_retry or {})
                 except Exception as exc2:
                     logger.exception("Retry with %s also failed for %s: %s", new_type, symbol, exc2)
                     raise
@@ -296,7 +534,7 @@ class BinanceClient:
                     params_retry.pop(k, None)
                 try:
                     logger.warning("Retrying create_order without reduceOnly due to error: %s", e)
-                    return await self.exchange.create_order(symbol, type, side, amount, price, params_retry or {})
+                    return await self._call("order", 1, self.exchange.create_order, symbol, type, side, amount, price, params_retry or {})
                 except Exception as e2:
                     logger.exception("Retry without reduceOnly failed for %s: %s", symbol, e2)
                     raise
@@ -309,7 +547,7 @@ class BinanceClient:
             logger.info("DRY RUN cancel_order %s %s", order_id, symbol)
             return {"id": order_id, "status": "canceled", "info": {"dry_run": True}}
         try:
-            return await self.exchange.cancel_order(order_id, symbol)
+            return await self._call("market", 1, self.exchange.cancel_order, order_id, symbol)
         except Exception as e:
             logger.warning("cancel_order failed for %s (%s): %s", order_id, symbol, e)
             return None
@@ -331,13 +569,13 @@ class BinanceClient:
             trades = []
             try:
                 if symbol:
-                    trades = await self.exchange.fetch_my_trades(symbol)
+                    trades = await self._call("market", 5, self.exchange.fetch_my_trades, symbol)
                 else:
-                    trades = await self.exchange.fetch_my_trades()
+                    trades = await self._call("market", 5, self.exchange.fetch_my_trades)
             except Exception as e:
                 logger.debug("fetch_my_trades initial call failed: %s", e)
                 try:
-                    trades = await self.exchange.fetch_my_trades()
+                    trades = await self._call("market", 5, self.exchange.fetch_my_trades)
                 except Exception as e2:
                     logger.warning("fetch_my_trades failed: %s", e2)
                     return []
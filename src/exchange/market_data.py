@@ -0,0 +1,282 @@
+# src/exchange/market_data.py
+"""
+Caché de velas en memoria alimentada por el stream combinado de klines de Binance Futures.
+
+Una conexión WebSocket combinada (`<symbol>@kline_<tf>`), repartida en varias si el universo
+supera MAX_STREAMS_PER_CONNECTION streams, mantiene un ring buffer (array numpy preasignado) de las últimas N velas por símbolo. El loop de
+trading lee de aquí en lugar de hacer un fetch REST por símbolo y ciclo; REST solo se
+usa para sembrar el buffer en el arranque. Opcionalmente la misma conexión se suscribe
+también a `<symbol>@aggTrade` para tener el precio de cada trade (salidas en paper).
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import websockets
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json for the stream messages
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# cada mensaje del stream (kline/aggTrade de todo el universo) pasa por aquí
+_loads = orjson.loads if orjson is not None else json.loads
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+WS_URL = "wss://fstream.binance.com/stream?streams="
+WS_URL_TESTNET = "wss://stream.binancefuture.com/stream?streams="
+# Binance Futures acepta como mucho 200 streams por conexión combinada; por encima se reparte
+MAX_STREAMS_PER_CONNECTION = 200
+
+
+def _stream_id(symbol: str) -> str:
+    """'BTC/USDT' (o 'BTC/USDT:USDT') -> 'btcusdt'."""
+    return symbol.split(":")[0].replace("/", "").lower()
+
+
+class MarketDataCache:
+    """
+    Las velas viven en un único array preasignado (símbolos, maxlen, 6) usado como ring
+    buffer por fila: en régimen estable ni los mensajes del stream ni la copia por ciclo
+    hacia la estrategia reservan memoria.
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        timeframe: str,
+        maxlen: int = 200,
+        testnet: bool = False,
+        agg_trades: bool = False,
+    ):
+        self.symbols: List[str] = list(symbols)
+        self.timeframe = timeframe
+        self.maxlen = maxlen
+        self.testnet = testnet
+        self.agg_trades = agg_trades
+        n = len(self.symbols)
+        self._index: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self._ring = np.zeros((n, maxlen, 6), dtype=np.float64)
+        self._next = np.zeros(n, dtype=np.int64)   # slot donde irá la próxima vela nueva
+        self._count = np.zeros(n, dtype=np.int64)  # velas válidas (<= maxlen)
+        self._last_trade = np.full(n, np.nan)  # precio del último aggTrade (si agg_trades)
+        # símbolos con vela cerrada ("x": true) aún no consumidos por wait_closed()
+        self._closed = np.zeros(n, dtype=bool)
+        self._closed_event = asyncio.Event()
+        self._by_stream_id = {_stream_id(s): s for s in self.symbols}
+        self._running = False
+        # todas las conexiones vivas y nº de conexiones hechas: tras una reconexión (de
+        # cualquier shard) el buffer puede tener huecos, los lectores que lo necesiten vuelven
+        # a sembrar (ver unified_main)
+        self.connected = False
+        self.epoch = 0
+        self._shards_total = 0
+        self._shards_up = 0
+        # symbol -> Event que se activa con cada mensaje de kline (ver wait_next_close)
+        self._ticks: Dict[str, asyncio.Event] = {}
+
+    def count(self, symbol: str) -> int:
+        i = self._index.get(symbol)
+        return 0 if i is None else int(self._count[i])
+
+    def _copy_last(self, i: int, m: int, out: np.ndarray, cols: slice = slice(None)):
+        """Copia las últimas m velas del símbolo i, en orden cronológico, a out (m filas)."""
+        start = (self._next[i] - m) % self.maxlen
+        first = min(m, self.maxlen - start)
+        out[:first] = self._ring[i, start:start + first, cols]
+        out[first:m] = self._ring[i, :m - first, cols]
+
+    def seed(self, symbol: str, df: pd.DataFrame):
+        """Carga inicial desde REST (DataFrame OHLCV en el orden estándar de columnas)."""
+        if df is None or df.shape[0] == 0:
+            return
+        ts = df["timestamp"]
+        if np.issubdtype(ts.dtype, np.datetime64):
+            ts = ts.astype("int64") // 1_000_000  # ns -> ms, como llegan del stream
+        arr = np.column_stack([ts.to_numpy(dtype=np.float64)] + [df[c].to_numpy(dtype=np.float64) for c in OHLCV_COLUMNS[1:]])
+        self.seed_array(symbol, arr)
+
+    def seed_array(self, symbol: str, arr: np.ndarray):
+        """Carga inicial desde el array crudo de ccxt (n, 6), sin pasar por DataFrame."""
+        i = self._index.get(symbol)
+        if i is None or arr is None or arr.shape[0] == 0:
+            return
+        rows = arr[-self.maxlen:]
+        m = rows.shape[0]
+        self._ring[i, :m] = rows
+        self._next[i] = m % self.maxlen
+        self._count[i] = m
+
+    def snapshot(self, symbol: str) -> pd.DataFrame:
+        """DataFrame con las velas en memoria; se construye solo cuando la estrategia lo necesita."""
+        i = self._index.get(symbol)
+        m = 0 if i is None else int(self._count[i])
+        out = np.empty((m, 6), dtype=np.float64)
+        if m:
+            self._copy_last(i, m, out)
+        return pd.DataFrame(out, columns=OHLCV_COLUMNS)
+
+    def last_rows(self, symbol: str, m: int) -> np.ndarray:
+        """Últimas min(m, count) velas (n, 6) en orden cronológico, mismo formato que ccxt."""
+        i = self._index.get(symbol)
+        m = 0 if i is None else min(m, int(self._count[i]))
+        out = np.empty((m, 6), dtype=np.float64)
+        if m:
+            self._copy_last(i, m, out)
+        return out
+
+    def last_close(self, symbol: str) -> float:
+        """Último close del buffer (vela abierta incluida) sin construir DataFrame; NaN si no hay datos."""
+        i = self._index.get(symbol)
+        if i is None or self._count[i] == 0:
+            return float("nan")
+        return float(self._ring[i, (self._next[i] - 1) % self.maxlen, 4])
+
+    def last_price(self, symbol: str) -> float:
+        """Precio del último aggTrade recibido; sin stream de trades (o aún sin datos), last_close()."""
+        i = self._index.get(symbol)
+        if i is None:
+            return float("nan")
+        px = self._last_trade[i]
+        return float(px) if px == px else self.last_close(symbol)
+
+    def last_closes(self) -> np.ndarray:
+        """last_close() de todos los símbolos, alineado con self.symbols (NaN sin datos)."""
+        out = self._ring[np.arange(len(self.symbols)), (self._next - 1) % self.maxlen, 4]
+        out[self._count == 0] = np.nan
+        return out
+
+    def fill_array(self, buf: np.ndarray, min_bars: int = 1, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Copia las velas en memoria a buf (len(symbols), depth, 5) -> open, high, low, close,
+        volume, alineadas al final de cada fila en el orden de self.symbols.
+        Devuelve cuántas velas válidas tiene cada fila; los símbolos con menos de `min_bars`
+        velas, o fuera de `mask` si se da, se saltan sin copiar nada (count 0).
+        """
+        depth = buf.shape[1]
+        counts = np.minimum(self._count, depth)
+        counts[counts < min_bars] = 0
+        if mask is not None:
+            counts[~mask] = 0
+        ohlcv = slice(1, 6)
+        for i in np.flatnonzero(counts):
+            m = int(counts[i])
+            self._copy_last(i, m, buf[i, depth - m:], ohlcv)
+        return counts
+
+    def _on_kline(self, k: dict):
+        symbol = self._by_stream_id.get(str(k.get("s", "")).lower())
+        if symbol is None:
+            return
+        i = self._index[symbol]
+        t = float(k["t"])
+        last = (self._next[i] - 1) % self.maxlen
+        # the open candle is pushed on every trade: update it in place until the next one starts
+        if self._count[i] and self._ring[i, last, 0] == t:
+            slot = last
+        else:
+            slot = self._next[i]
+            self._next[i] = (slot + 1) % self.maxlen
+            self._count[i] = min(self._count[i] + 1, self.maxlen)
+        row = self._ring[i, slot]
+        row[0] = t
+        row[1] = float(k["o"])
+        row[2] = float(k["h"])
+        row[3] = float(k["l"])
+        row[4] = float(k["c"])
+        row[5] = float(k["v"])
+        if k.get("x"):
+            self._closed[i] = True
+            self._closed_event.set()
+        tick = self._ticks.get(symbol)
+        if tick is not None:
+            tick.set()
+
+    async def wait_closed(self, settle: float = 0.2) -> np.ndarray:
+        """
+        Espera a que cierre al menos una vela y devuelve la máscara (len(symbols),) de los
+        símbolos que han cerrado desde la última llamada. Tras el primer cierre espera
+        `settle` s para agrupar los del resto del universo, que llegan casi a la vez.
+        """
+        await self._closed_event.wait()
+        if settle > 0:
+            await asyncio.sleep(settle)
+        mask = self._closed.copy()
+        self._closed[:] = False
+        self._closed_event.clear()
+        return mask
+
+    def _on_agg_trade(self, data: dict):
+        symbol = self._by_stream_id.get(str(data.get("s", "")).lower())
+        if symbol is None:
+            return
+        self._last_trade[self._index[symbol]] = float(data["p"])
+        tick = self._ticks.get(symbol)
+        if tick is not None:
+            tick.set()
+
+    async def wait_next_close(self, symbol: str, timeout: float = 2.0) -> float:
+        """
+        Espera al próximo mensaje (kline o aggTrade) del símbolo, o a `timeout` segundos, y
+        devuelve last_price(). Sustituye a sleep + fetch REST: despierta en cuanto llega dato real.
+        """
+        tick = self._ticks.setdefault(symbol, asyncio.Event())
+        tick.clear()
+        try:
+            await asyncio.wait_for(tick.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.last_price(symbol)
+
+    async def run(self):
+        """Consume el stream combinado, en tantas conexiones como haga falta para no pasar de
+        MAX_STREAMS_PER_CONNECTION; cada una reconecta con backoff si cae."""
+        kinds = [f"kline_{self.timeframe}"] + (["aggTrade"] if self.agg_trades else [])
+        per_conn = max(1, MAX_STREAMS_PER_CONNECTION // len(kinds))
+        shards = [self.symbols[i:i + per_conn] for i in range(0, len(self.symbols), per_conn)]
+        self._shards_total = len(shards)
+        self._shards_up = 0
+        self._running = True
+        await asyncio.gather(*(self._run_shard(shard, kinds, n) for n, shard in enumerate(shards, 1)))
+
+    async def _run_shard(self, symbols: List[str], kinds: List[str], n: int):
+        streams = "/".join(f"{_stream_id(s)}@{kind}" for s in symbols for kind in kinds)
+        url = (WS_URL_TESTNET if self.testnet else WS_URL) + streams
+        backoff = 1.0
+        while self._running:
+            try:
+                async with websockets.connect(url, ping_interval=20) as ws:
+                    logger.info(
+                        "Kline stream connected (%d symbols, %s, connection %d/%d)",
+                        len(symbols), self.timeframe, n, self._shards_total,
+                    )
+                    backoff = 1.0
+                    self.epoch += 1
+                    self._shards_up += 1
+                    self.connected = self._shards_up == self._shards_total
+                    try:
+                        async for raw in ws:
+                            msg = _loads(raw)
+                            data = msg.get("data") or {}
+                            event = data.get("e")
+                            if event == "aggTrade":
+                                self._on_agg_trade(data)
+                            elif event == "kline":
+                                self._on_kline(data["k"])
+                    finally:
+                        self._shards_up -= 1
+                        self.connected = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Kline stream error (connection %d): %s (reconnecting in %.0fs)", n, e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def stop(self):
+        self._running = False
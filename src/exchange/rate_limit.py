@@ -0,0 +1,134 @@
+# src/exchange/rate_limit.py
+"""
+Limitación de ritmo del lado cliente para las llamadas REST (p.ej. el setup de
+leverage/margin de todo el universo al arrancar), en lugar de sleeps fijos entre llamadas.
+
+BinanceRateLimiter (uno por BinanceClient) reparte el presupuesto por tipo de endpoint con las ventanas reales de
+Binance USDT-M y se resincroniza con las cabeceras X-MBX-* de cada respuesta.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (tokens/s, ráfaga) por endpoint: REQUEST_WEIGHT 2400/min por IP, ORDERS 300/10s por cuenta
+BINANCE_ENDPOINT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "market": (2400 / 60, 2400),
+    "order": (300 / 10, 300),
+}
+_USED_WEIGHT_HEADER = "x-mbx-used-weight-1m"
+_ORDER_COUNT_HEADER = "x-mbx-order-count-10s"
+
+
+def kline_weight(limit: int) -> float:
+    """Peso de GET /fapi/v1/klines según `limit` (tabla de Binance USDT-M)."""
+    if limit < 100:
+        return 1.0
+    if limit < 500:
+        return 2.0
+    return 5.0 if limit <= 1000 else 10.0
+
+
+class TokenBucket:
+    """Token bucket async: `rate` tokens/s, ráfagas de hasta `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def sync_used(self, used: float):
+        """Ajusta los tokens al consumo que reporta el servidor en la ventana actual."""
+        self._refill()
+        self._tokens = min(self._tokens, max(0.0, self.capacity - used))
+
+    async def acquire(self, cost: float = 1.0):
+        # el lock mantiene el orden FIFO entre tareas que esperan tokens
+        async with self._lock:
+            self._refill()
+            while self._tokens < cost:
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= cost
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    name = type(exc).__name__
+    return name in ("RateLimitExceeded", "DDoSProtection") or "429" in str(exc) or "418" in str(exc)
+
+
+def _retry_after(client: Any) -> Optional[float]:
+    headers = getattr(client, "last_response_headers", None) or {}
+    try:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Retry-After del servidor si lo hay; si no, 2**attempt s. Siempre con jitter (hasta +50%)."""
+    delay = retry_after or 2.0 ** attempt
+    return delay + random.uniform(0, delay / 2)
+
+
+def _header(headers: Mapping[str, Any], name: str) -> Optional[float]:
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class BinanceRateLimiter:
+    """
+    Un TokenBucket por tipo de endpoint ("market": peso de peticiones, "order": nº de órdenes).
+    Las órdenes gastan de ambos. Tras cada respuesta, observe() alinea los buckets con el peso
+    y el nº de órdenes que Binance dice llevar gastados, así otras llamadas fuera de este
+    cliente (o de otro proceso con la misma IP) también cuentan.
+    """
+
+    def __init__(self, limits: Mapping[str, Tuple[float, float]] = BINANCE_ENDPOINT_LIMITS):
+        self._buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+
+    async def acquire(self, endpoint: str = "market", weight: float = 1.0):
+        if endpoint == "order":
+            await self._buckets["order"].acquire(1.0)
+        await self._buckets["market"].acquire(weight)
+
+    def observe(self, headers: Mapping[str, Any]):
+        used = _header(headers, _USED_WEIGHT_HEADER)
+        if used is not None:
+            self._buckets["market"].sync_used(used)
+        orders = _header(headers, _ORDER_COUNT_HEADER)
+        if orders is not None:
+            self._buckets["order"].sync_used(orders)
+
+    async def call(self, client: Any, endpoint: str, weight: float, fn: Callable[..., Awaitable], *args, retries: int = 3, **kwargs):
+        """await fn(*args, **kwargs) dentro del presupuesto; ante 429/418 espera y reintenta."""
+        for attempt in range(retries + 1):
+            await self.acquire(endpoint, weight)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                self.observe(getattr(client, "last_response_headers", None) or {})
+                if attempt == retries or not _is_rate_limited(e):
+                    raise
+                delay = backoff_delay(attempt, _retry_after(client))
+                logger.warning("Rate limited on %s, retrying in %.1fs", getattr(fn, "__name__", fn), delay)
+                await asyncio.sleep(delay)
+                continue
+            self.observe(getattr(client, "last_response_headers", None) or {})
+            return result
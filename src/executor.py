@@ -31,7 +31,7 @@ class Executor:
         """
         if self.dry_run:
             logger.info("DRY_RUN place_limit_post_only_entry %s %s %f @ %f", symbol, side, amount, price)
-            return {"id": f"sim-entry-{symbol}-{int(asyncio.get_event_loop().time())}", "status": "open", "price": price}
+            return {"id": f"sim-entry-{symbol}-{int(asyncio.get_running_loop().time())}", "status": "open", "price": price}
         try:
             params = {"postOnly": True}
             # ccxt create_order usage: create_order(symbol, type, side, amount, price, params)
@@ -46,8 +46,9 @@ class Executor:
         """
         Poll order status until filled or timeout (seconds). Returns final order dict.
         """
-        end = asyncio.get_event_loop().time() + timeout
-        while asyncio.get_event_loop().time() < end:
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        while loop.time() < end:
             try:
                 order = await self.client.fetch_order(order_id, symbol)
                 if not order:
@@ -1,27 +1,149 @@
+import time
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+import numpy as np
 import pandas as pd
 import logging
 
+from src.config import OHLCV_CACHE_DIR, OHLCV_CACHE_SIZE_MB
+
+try:
+    import diskcache
+except ImportError:  # optional: without it every call goes to the exchange
+    diskcache = None
+
 logger = logging.getLogger(__name__)
 
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+_TF_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000}
+_MAX_BARS_PER_REQUEST = 1000
+# velas semanales/mensuales no caben en un mes natural (y 'M' no son 30 días): sin caché
+_UNCACHED_UNITS = ("w", "M")
 
-async def fetch_ohlcv_for_symbol(
-    exchange, symbol: str, timeframe: str = "1h", limit: int = 200
-):
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None and diskcache is not None:
+        _cache = diskcache.Cache(OHLCV_CACHE_DIR, size_limit=OHLCV_CACHE_SIZE_MB * 1024 * 1024)
+    return _cache
+
+
+def timeframe_ms(timeframe: str) -> int:
+    """'1m' -> 60000, '4h' -> 14400000, ..."""
+    return int(timeframe[:-1]) * _TF_SECONDS[timeframe[-1]] * 1000
+
+
+def _month_bounds(ts_ms: int) -> Tuple[str, int, int]:
+    """(bucket 'YYYY-MM', start_ms, end_ms) of the UTC month containing ts_ms."""
+    d = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+    start = datetime(d.year, d.month, 1, tzinfo=timezone.utc)
+    end = datetime(d.year + (d.month == 12), d.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return start.strftime("%Y-%m"), int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+async def _fetch_range(exchange, symbol: str, timeframe: str, lo: int, hi: int, tf_ms: int) -> np.ndarray:
+    """Bars with lo <= ts < hi as a (n, 6) float64 array, paginating the exchange."""
+    blocks = []
+    since = lo
+    while since < hi:
+        limit = min(_MAX_BARS_PER_REQUEST, max(1, (hi - since) // tf_ms))
+        raw = await exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        if not raw:
+            break
+        arr = np.asarray(raw, dtype=np.float64)
+        blocks.append(arr)
+        last = int(arr[-1, 0])
+        if last + tf_ms <= since:
+            break
+        since = last + tf_ms
+    if not blocks:
+        return np.empty((0, 6), dtype=np.float64)
+    arr = np.concatenate(blocks)
+    return arr[(arr[:, 0] >= lo) & (arr[:, 0] < hi)]
+
+
+async def _closed_month_bars(cache, exchange, symbol: str, timeframe: str, bucket: str, lo: int, hi: int, tf_ms: int) -> np.ndarray:
     """
-    Returns a DataFrame with columns: ['timestamp','open','high','low','close','volume']
+    Bars of an already-closed month. Closed bars never change, so they are kept on disk
+    without expiry together with the (contiguous) range they cover. Only a complete fetch
+    (last bar reaching `hi`) is stored: the client returns None on transient errors, and a
+    partial or empty result must not be cached as if it covered the whole range.
+    """
+    key = (symbol, timeframe, bucket)
+    req_lo, req_hi = lo, hi
+    hit = cache.get(key)
+    if hit is not None:
+        c_lo, c_hi, blob = hit
+        arr = np.frombuffer(blob, dtype=np.float64).reshape(-1, 6)
+        if c_lo <= lo and hi <= c_hi:
+            return arr[(arr[:, 0] >= lo) & (arr[:, 0] < hi)]
+        lo, hi = min(lo, c_lo), max(hi, c_hi)
+    arr = await _fetch_range(exchange, symbol, timeframe, lo, hi, tf_ms)
+    if arr.shape[0] and arr[-1, 0] + tf_ms >= hi:
+        cache.set(key, (lo, hi, arr.tobytes()), expire=None)
+    # the fetch may have been widened to the cached range: return only what was asked for
+    return arr[(arr[:, 0] >= req_lo) & (arr[:, 0] < req_hi)]
+
+
+async def fetch_ohlcv_array(
+    exchange, symbol: str, timeframe: str = "1h", limit: int = 200, since: Optional[int] = None
+) -> np.ndarray:
+    """
+    OHLCV as a (n, 6) float64 array (timestamp ms, open, high, low, close, volume), without
+    building a DataFrame. Empty (0, 6) array on error.
+
+    With diskcache installed, bars from closed months are served from an on-disk cache keyed
+    by (symbol, timeframe, 'YYYY-MM'); only the current month is requested from the exchange.
+    Weekly/monthly timeframes always go to the exchange.
+    `since` (ms) selects a historical window of `limit` bars, e.g. for backtests.
     """
     try:
-        raw = await exchange.fetch_ohlcv(
-            symbol, timeframe=timeframe, since=None, limit=limit
-        )
-        if not raw:
-            return pd.DataFrame()
-        df = pd.DataFrame(
-            raw, columns=["timestamp", "open", "high", "low", "close", "volume"]
-        )
-        # convert timestamp (ms) to datetime index optional
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        return df
+        cache = _get_cache() if timeframe[-1] not in _UNCACHED_UNITS else None
+        if cache is None:
+            raw = await exchange.fetch_ohlcv(
+                symbol, timeframe=timeframe, since=since, limit=limit
+            )
+            if not raw:
+                return np.empty((0, 6), dtype=np.float64)
+            return np.asarray(raw, dtype=np.float64)
+        tf_ms = timeframe_ms(timeframe)
+        now_ms = int(time.time() * 1000)
+        lo = since if since is not None else (now_ms // tf_ms - limit + 1) * tf_ms
+        hi = min(lo + limit * tf_ms, now_ms + tf_ms)
+        live_bucket = _month_bounds(now_ms)[0]
+        blocks = []
+        cur = lo
+        while cur < hi:
+            bucket, _, m_end = _month_bounds(cur)
+            part_hi = min(hi, m_end)
+            if bucket == live_bucket:
+                blocks.append(await _fetch_range(exchange, symbol, timeframe, cur, part_hi, tf_ms))
+            else:
+                blocks.append(await _closed_month_bars(cache, exchange, symbol, timeframe, bucket, cur, part_hi, tf_ms))
+            cur = part_hi
+        arr = np.concatenate(blocks) if blocks else np.empty((0, 6), dtype=np.float64)
+        return arr[-limit:]
     except Exception as e:
         logger.exception("Failed to fetch ohlcv for %s: %s", symbol, e)
+        return np.empty((0, 6), dtype=np.float64)
+
+
+async def fetch_ohlcv_for_symbol(
+    exchange, symbol: str, timeframe: str = "1h", limit: int = 200, since: Optional[int] = None
+):
+    """
+    Returns a DataFrame with columns: ['timestamp','open','high','low','close','volume']
+
+    Thin wrapper over fetch_ohlcv_array() for callers that want pandas; hot paths should use
+    the array directly (see strategy.decide_trade_array).
+    """
+    arr = await fetch_ohlcv_array(exchange, symbol, timeframe=timeframe, limit=limit, since=since)
+    if arr.shape[0] == 0:
         return pd.DataFrame()
+    df = pd.DataFrame(arr, columns=OHLCV_COLUMNS)
+    # convert timestamp (ms) to datetime index optional
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+    return df
@@ -1,6 +1,8 @@
+import atexit
 import logging
 import os
-from datetime import datetime
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
+from queue import SimpleQueue
 from src.config import LOG_LEVEL
 
 level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
@@ -16,12 +18,16 @@ if not root.handlers:
     ch = logging.StreamHandler()
     ch.setLevel(level)
     ch.setFormatter(logging.Formatter(fmt))
-    root.addHandler(ch)
 
-    # File handler: one file per day
+    # File handler: rotates at midnight (crypto_bot.log.YYYY-MM-DD), keeps two weeks
     os.makedirs("logs", exist_ok=True)
-    log_path = f"logs/crypto_bot_{datetime.now().strftime('%Y-%m-%d')}.log"
-    fh = logging.FileHandler(log_path, mode="a", encoding="utf-8")
+    fh = TimedRotatingFileHandler("logs/crypto_bot.log", when="midnight", backupCount=14, encoding="utf-8")
     fh.setLevel(level)
     fh.setFormatter(logging.Formatter(fmt))
-    root.addHandler(fh)
+
+    # Producers only pay for a queue.put; console/disk I/O happens on the listener thread
+    log_queue = SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, ch, fh, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
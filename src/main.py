@@ -1,179 +1,493 @@
+"""
+Bot top-K / pipeline sobre el stream de klines (`python -m src.main`).
+
+Usa el mismo BinanceClient (async) y StateManager que unified_main.py. En live las entradas
+y sus SL/TP pasan por ScalpingOrderManager; en paper se registran en el OrderManager local y
+se cierran al siguiente tick.
+"""
 from __future__ import annotations
+import asyncio
 import logging
+import math
+import os
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+import src.logging_config  # noqa: F401  (handlers en QueueListener: la E/S de logs sale del event loop)
 from src.config import (
-    MODE, BINANCE_TESTNET, BINANCE_API_KEY, BINANCE_API_SECRET, STARTING_BALANCE_USDT,
+    API_KEY, API_SECRET, USE_TESTNET, DRY_RUN, HEDGE_MODE, FAST_RATE_LIMIT,
+    MODE, STARTING_BALANCE_USDT,
     POSITION_SIZE_PERCENT, DAILY_PROFIT_TARGET_USD, MAX_DAILY_LOSS_USD, TIMEFRAME, MAX_SYMBOLS,
-    MIN_24H_VOLUME_USDT, SLEEP_SECONDS_BETWEEN_CYCLES, LOG_LEVEL, LEVERAGE, MARGIN_MODE,
-    MAX_ACTIVE_SYMBOLS, TOP_K_SELECTION
+    MIN_24H_VOLUME_USDT, SLEEP_SECONDS_BETWEEN_CYCLES, LEVERAGE, MARGIN_MODE,
+    MAX_ACTIVE_SYMBOLS, TOP_K_SELECTION, CAPITAL_MAX_USDT, BOT_CPU
+)
+from src.config.plan_loader import TradingPlan, get_plan_loader
+from src.exchange.binance_client import BinanceClient
+from src.exchange.market_data import MarketDataCache
+from src.fetcher import timeframe_ms
+from src.strategy.strategy import (
+    decide_trade_array, decide_trade_batch, warmup as warmup_strategy, MIN_BARS, SIGNAL_BUY, SIGNAL_HOLD,
 )
-from src.exchange.binance_client import BinanceFuturesClient
-from src.strategy.strategy import decide_signal, decide_trade
-from src.state import load_state, save_state, reset_if_new_day, can_open_new_trades, update_pnl
+from src.state_manager import StateManager
 from src.orders.manager import OrderManager
-from src.persistence.sqlite_store import save_balance, _ensure_db
-from src.telegram.console import send_message, poll_commands
-from src.risk.manager import compute_sl_tp
+from src.trading.scalping_order_manager import ScalpingOrderManager
+from src.persistence.batched_writer import BalanceBatchWriter
+from src.persistence.sqlite_store import load_symbol_config, save_symbol_config
+from src.telegram.console import send_message, poll_commands, close as close_telegram
 from src.pair_selector import PairSelector
 
-from src.config import LOG_LEVEL
-from src.simple_strategy import decide_trade
-from src.orders.manager import order_manager
+log = logging.getLogger(__name__)
+
+BALANCE_TTL_SEC = 5.0  # además se invalida al empezar cada ciclo y tras cada fill
+SYMBOL_CONCURRENCY = 8  # traders (símbolos operándose a la vez) en el pipeline legacy
+DECIDED_QUEUE_MAXSIZE = 256  # señales pendientes de ejecutar antes de frenar al decider
+# Plantillas de mensajes (%-format): las partes fijas del status se resuelven una vez al importar
+_MSG_STATUS = (
+    f"Mode: {MODE}\nEquity: %.2f USDT\nPNL hoy: %.2f\n"
+    f"Target: {DAILY_PROFIT_TARGET_USD:.2f} | MaxLoss: {MAX_DAILY_LOSS_USD:.2f}\n"
+    f"Pausado: %s\nTop-K: {TOP_K_SELECTION} (max {MAX_ACTIVE_SYMBOLS})"
+)
+_MSG_LIVE_ENTRY = "%s %s @ %.2f | SL %.2f | TP %.2f"
+_MSG_LIVE_FAILED = "%s %s: la entrada no se pudo colocar"
+_MSG_PAPER_TRADE = "%s %s @ %.2f -> exit %.2f | PnL: %.2f USDT | PnL día: %.2f"
+_MSG_SELECTION = "Top-%d de %d símbolos: %s"
+SIDE_SIGN_BY_NAME = {"buy": 1.0, "sell": -1.0}
+PAPER_FEE_RATE = 0.0004  # ida+vuelta aprox
+PAPER_EXIT_TIMEOUT_SEC = 2.0  # paper: salida simulada en el siguiente tick (o al vencer)
+DEFAULT_SL_PCT = 0.002  # live sin SL/TP de la estrategia: SL a ±0.2%...
+DEFAULT_TP_PCT = 0.004  # ...y TP a ±0.4% del precio de entrada
+CANDLE_CLOSE_SETTLE_SEC = 0.2  # margen para agrupar los cierres de vela de todo el universo
+SEED_CONCURRENCY = 10  # fetch REST iniciales de velas en paralelo
+SETUP_CONCURRENCY = 10  # símbolos configurándose (leverage/margin) a la vez en el arranque
+
 
 class Context:
+    # plan resuelto por el primer Context; los siguientes (reinicios en caliente) lo comparten
+    _plan_cache: Optional[TradingPlan] = None
+
     def __init__(self):
-        self.exchange = BinanceFuturesClient(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=BINANCE_TESTNET)
-        self.state = load_state()
-        self.equity_usdt = STARTING_BALANCE_USDT if MODE == "paper" else max(STARTING_BALANCE_USDT, self.exchange.get_balance_usdt())
-        self.om = OrderManager(self.exchange, self.get_equity)
-        self.pair_selector = PairSelector(self.exchange, self.get_equity)
+        """Objetos locales, sin E/S: la red y el disco se resuelven en start()."""
+        self.exchange = BinanceClient(
+            api_key=API_KEY,
+            api_secret=API_SECRET,
+            use_testnet=USE_TESTNET,
+            dry_run=DRY_RUN,
+            hedge_mode=HEDGE_MODE,
+            fast_rate_limit=FAST_RATE_LIMIT,
+        )
+        self.balance_writer = BalanceBatchWriter()
+        self.state = StateManager(daily_profit_target=DAILY_PROFIT_TARGET_USD)
+        self.om = OrderManager()  # paper: registro local de las órdenes simuladas
+        self.scalper = ScalpingOrderManager(self.exchange, self.state, hedge_mode=HEDGE_MODE)
+        self.pair_selector = PairSelector(self.exchange)
+        self.plan: Optional[TradingPlan] = None
+        self.equity_usdt = STARTING_BALANCE_USDT
+        self.paused = False  # /pause | /resume (en memoria: un reinicio vuelve a operar)
+        self._balance_cache = (0.0, 0.0)  # (value, monotonic expiry)
+        # lectura de balance en curso compartida por las tareas que la piden a la vez
+        self._balance_refresh: Optional[asyncio.Future] = None
+        self._balance_gen = 0  # se incrementa al invalidar: una lectura anterior no se cachea
+        # límites diarios: solo cambian con un PnL nuevo, /pause|/resume o al cambiar el día UTC
+        self._utc_day = -1
+        self.can_trade = False
+
+    async def start(self):
+        """JIT de la estrategia y después plan (YAML) y balance (REST, solo live) en paralelo."""
+        # en el hilo del loop, no en el pool: si el runtime paralelo de numba (TBB) arranca
+        # desde un hilo secundario el proceso se queda colgado al salir. Con la caché en disco
+        # es ~1s, antes de que haya nada más en marcha.
+        warmup_strategy()
+        jobs = []
+        if Context._plan_cache is None:
+            jobs.append(asyncio.to_thread(get_plan_loader().get_plan))
+        if MODE != "paper":
+            jobs.append(self.exchange.fetch_balance_usdt())
+        results = await asyncio.gather(*jobs)
+        if Context._plan_cache is None:
+            Context._plan_cache = results[0]
+        self.plan = Context._plan_cache
+        if MODE != "paper":
+            self.equity_usdt = max(STARTING_BALANCE_USDT, results[-1])
+
+    async def close(self):
+        await self.exchange.close()
+
+    async def _aequity_paper(self) -> float:
+        return min(self.equity_usdt, CAPITAL_MAX_USDT)
+
+    async def _aequity_live(self) -> float:
+        value, expiry = self._balance_cache
+        if time.monotonic() < expiry:
+            return value
+        # tras un fill varios traders la piden a la vez: una sola petición REST para todos
+        task = self._balance_refresh
+        if task is not None:
+            return min(max(0.0, await asyncio.shield(task)), CAPITAL_MAX_USDT)
+        gen = self._balance_gen
+        task = self._balance_refresh = asyncio.ensure_future(self.exchange.fetch_balance_usdt())
+        try:
+            raw = await asyncio.shield(task)
+        finally:
+            if self._balance_refresh is task:
+                self._balance_refresh = None
+        value = min(max(0.0, raw), CAPITAL_MAX_USDT)
+        if gen == self._balance_gen:
+            self._balance_cache = (value, time.monotonic() + BALANCE_TTL_SEC)
+        return value
+
+    # MODE es fijo durante todo el proceso: la variante se elige una vez, al definir la clase.
+    # aget_equity(): equity usable para sizing, con tope CAPITAL_MAX_USDT. En live el balance
+    # del exchange se cachea BALANCE_TTL_SEC (solo cambia con un fill) y el loop lo invalida
+    # una vez por ciclo: como mucho una petición de balance por ciclo más una por fill.
+    aget_equity = _aequity_paper if MODE == "paper" else _aequity_live
+
+    def roll_day(self) -> bool:
+        """Reset diario del StateManager solo cuando cambia el día UTC; devuelve el flag can_trade cacheado."""
+        day = int(time.time() // 86400)
+        if day != self._utc_day:
+            self._utc_day = day
+            self.state.reset_daily_if_needed()
+            self.refresh_can_trade()
+        return self.can_trade
+
+    def refresh_can_trade(self):
+        self.can_trade = (
+            not self.paused
+            and self.state.realized_pnl_today > -MAX_DAILY_LOSS_USD
+            and self.state.can_open_new_trade()
+        )
+
+    def record_pnl(self, sym: str, pnl: float, close_price: float):
+        self.state.register_closed_position(sym, pnl, "paper", close_price=close_price)
+        self.refresh_can_trade()
+
+    def invalidate_balance(self):
+        """Force the next aget_equity() to re-read the exchange (e.g. right after a fill)."""
+        self._balance_cache = (0.0, 0.0)
+        self._balance_gen += 1
+        self._balance_refresh = None  # una lectura en vuelo puede ser anterior al fill
+
+
+async def _notify(msg: str, notes: Optional[list]):
+    """Con `notes` el mensaje se acumula y el llamador lo encola al final del ciclo."""
+    if notes is None:
+        await send_message(msg)
+    else:
+        notes.append(msg)
+
+
+async def _open_live(sym: str, side: str, px: float, notional: float, ctx: Context,
+                     sl_price: Optional[float] = None, tp_price: Optional[float] = None,
+                     notes: Optional[list] = None):
+    """Live: entrada LIMIT y SL/TP vía ScalpingOrderManager sobre la cantidad realmente llenada.
+    Sin SL/TP de la estrategia se usan ±DEFAULT_SL_PCT/DEFAULT_TP_PCT."""
+    sl_dist = abs(px - sl_price) if sl_price is not None and tp_price is not None else 0.0
+    if sl_dist > 0:
+        stop_pct, rr = sl_dist / px, abs(tp_price - px) / sl_dist
+    else:
+        stop_pct, rr = DEFAULT_SL_PCT, DEFAULT_TP_PCT / DEFAULT_SL_PCT
+    meta = await ctx.scalper.place_scalping_trade(
+        sym, "long" if side == "buy" else "short", px, notional / px, stop_pct, rr,
+    )
+    ctx.invalidate_balance()
+    if not meta.get("entry_order_id"):
+        await _notify(_MSG_LIVE_FAILED % (sym, side.upper()), notes)
+        return
+    await _notify(_MSG_LIVE_ENTRY % (sym, side.upper(), px, meta.get("sl") or 0.0, meta.get("tp") or 0.0), notes)
+
+
+async def _open_paper(sym: str, side: str, px: float, notional: float, ctx: Context,
+                      sl_price: Optional[float] = None, tp_price: Optional[float] = None,
+                      notes: Optional[list] = None):
+    """Paper: salida simulada al siguiente tick (sin brackets: sl/tp se ignoran)."""
+    ctx.om.place_order(sym, side, notional / px, px, sl_price, tp_price)
+    px2 = await ctx.market_data.wait_next_close(sym, timeout=PAPER_EXIT_TIMEOUT_SEC)
+    if math.isnan(px2):
+        return
+    gross_pnl = SIDE_SIGN_BY_NAME[side] * (px2 - px) * notional / px
+    fees = notional * PAPER_FEE_RATE
+    net_pnl = gross_pnl - fees
+
+    ctx.equity_usdt += net_pnl
+    ctx.record_pnl(sym, net_pnl, px2)
+
+    await _notify(_MSG_PAPER_TRADE % (sym, side.upper(), px, px2, net_pnl, ctx.state.realized_pnl_today), notes)
+
+
+# elegido una vez: el camino caliente no vuelve a comparar MODE por trade
+open_trade = _open_live if MODE == "live" else _open_paper
+
+
+async def process_symbol(sym: str, sig: int, px: float, notional: float, ctx: Context, halted: asyncio.Event):
+    """Opera un símbolo con señal ya calculada; `notional` es el tamaño del ciclo (equity * %).
+    `halted` se activa en cuanto se alcanza el límite diario, para que las tareas que siguen
+    en vuelo terminen sin abrir más."""
+    if halted.is_set():
+        return
+
+    await open_trade(sym, "buy" if sig == SIGNAL_BUY else "sell", px, notional, ctx)
+
+    ctx.balance_writer.offer(await ctx.aget_equity())
+    if not ctx.can_trade:
+        halted.set()
+
+
+async def _decider(ctx: Context, decided_q: asyncio.Queue, in_flight: set, halted: asyncio.Event):
+    """Etapa 1 del pipeline legacy: cada vez que el stream cierra velas evalúa la estrategia
+    sobre esos símbolos (en el pool de hilos) y encola los que tienen señal, sin esperar a
+    que terminen las órdenes anteriores. Un símbolo que sigue en vuelo no se vuelve a encolar."""
+    loop = asyncio.get_running_loop()
+    market_data = ctx.market_data
+    symbols = market_data.symbols
+    # minQty/minNotional de cada símbolo del universo: filas fijas, resueltas una vez (los
+    # markets ya están cargados: el universo sale de fetch_usdt_perp_symbols)
+    filter_rows = ctx.exchange.filter_rows(symbols)
+    while True:
+        closed = await market_data.wait_closed(CANDLE_CLOSE_SETTLE_SEC)
+        try:
+            ctx.invalidate_balance()
+            if not ctx.roll_day():
+                log.debug("Cannot trade (daily limits or paused)")
+            else:
+                halted.clear()
+                notional = await ctx.aget_equity() * POSITION_SIZE_PERCENT
+                prices = market_data.last_closes()
+                # solo se evalúan los símbolos con vela nueva que además cumplen minQty/minNotional
+                # con el tamaño de este ciclo: el resto no podría operar, ni se copia ni se calcula
+                active = closed & ctx.exchange.feasible_mask(filter_rows, notional, prices)
+                # el buffer solo lo toca esta etapa: se rellena y se evalúa antes del siguiente ciclo
+                counts = market_data.fill_array(ctx.ohlcv_buf, min_bars=MIN_BARS, mask=active)
+                signals, _, _, _ = await loop.run_in_executor(None, decide_trade_batch, ctx.ohlcv_buf, counts)
+                tradable = signals != SIGNAL_HOLD
+                prices = market_data.last_closes()  # precio de entrada: el más reciente tras evaluar
+                for i in np.flatnonzero(tradable):
+                    sym = symbols[i]
+                    if sym in in_flight:
+                        continue
+                    in_flight.add(sym)
+                    await decided_q.put((sym, int(signals[i]), float(prices[i]), notional))
+        except Exception as e:
+            log.exception("Decider error: %s", e)
+
+
+async def _trader(ctx: Context, decided_q: asyncio.Queue, in_flight: set, halted: asyncio.Event):
+    """Etapa 2 del pipeline legacy: ejecuta las señales según llegan."""
+    while True:
+        sym, sig, px, notional = await decided_q.get()
+        try:
+            await process_symbol(sym, sig, px, notional, ctx, halted)
+        except Exception as e:
+            log.exception("Trade error on %s: %s", sym, e)
+        finally:
+            in_flight.discard(sym)
 
 
 async def handle_command(text: str, ctx: Context):
     if text == "/status":
-        msg = f"Mode: {MODE}\nEquity: {ctx.get_equity():.2f} USDT\nPNL hoy: {ctx.state.pnl_today:.2f}\nTarget: {DAILY_PROFIT_TARGET_USD:.2f} | MaxLoss: {MAX_DAILY_LOSS_USD:.2f}\nPausado: {ctx.state.paused}\nTop-K: {TOP_K_SELECTION} (max {MAX_ACTIVE_SYMBOLS})"
+        msg = _MSG_STATUS % (await ctx.aget_equity(), ctx.state.realized_pnl_today, ctx.paused)
         await send_message(msg)
-    elif text == "/pause":
-        ctx.state.paused = True
-        save_state(ctx.state)
-        await send_message("Bot pausado.")
-    elif text == "/resume":
-        ctx.state.paused = False
-        save_state(ctx.state)
-        await send_message("Bot reanudado.")
-
-    decision = decide_trade(symbol, features, price, atr)
-    if not decision:
-        logger.info("No signal for %s", symbol)
+    elif text in ("/pause", "/resume"):
+        paused = text == "/pause"
+        if ctx.paused != paused:
+            ctx.paused = paused
+            ctx.refresh_can_trade()
+        await send_message("Bot pausado." if paused else "Bot reanudado.")
+
+
+def _pin_cpu():
+    """Fija el proceso a BOT_CPU (solo Linux): el event loop no migra entre cores."""
+    if BOT_CPU is None or not hasattr(os, "sched_setaffinity"):
         return
+    try:
+        os.sched_setaffinity(0, {BOT_CPU})
+        log.info("Pinned to CPU %d", BOT_CPU)
+    except OSError as e:
+        log.warning("Could not pin to CPU %s: %s", BOT_CPU, e)
+
+
+async def _setup_live_symbols(ctx: Context, symbols: List[str]):
+    """Leverage y margin mode de los símbolos cuya configuración aplicada (guardada en sqlite)
+    no coincide; el rate limiter del cliente marca el ritmo."""
+    configured = await asyncio.to_thread(load_symbol_config, USE_TESTNET)
+    wanted = (MARGIN_MODE, LEVERAGE)
+    pending = [s for s in symbols if configured.get(s) != wanted]
+    log.info(
+        "Setting leverage %s and margin mode %s for live trading (%d/%d symbols, rest already set)",
+        LEVERAGE, MARGIN_MODE, len(pending), len(symbols),
+    )
+    # el semáforo evita encolar todo el universo de golpe en el limiter y el pool HTTP
+    setup_sem = asyncio.Semaphore(SETUP_CONCURRENCY)
+
+    async def _prepare_symbol(sym: str):
+        async with setup_sem:
+            # endpoints independientes: margin type y leverage a la vez
+            await asyncio.gather(
+                ctx.exchange.set_margin_mode(sym, MARGIN_MODE),
+                ctx.exchange.set_leverage(sym, LEVERAGE),
+            )
+
+    results = await asyncio.gather(*(_prepare_symbol(s) for s in pending), return_exceptions=True)
+    done = []
+    for sym, res in zip(pending, results):
+        if isinstance(res, Exception):
+            log.warning("Leverage/margin setup failed for %s: %s", sym, res)
+        else:
+            done.append((sym, MARGIN_MODE, LEVERAGE))
+    await asyncio.to_thread(save_symbol_config, USE_TESTNET, done)
+
+
+async def _seed_market_data(ctx: Context, symbols: List[str]):
+    """Una petición REST de velas por símbolo, en paralelo, para sembrar el buffer del stream."""
+    market_data = ctx.market_data
+    seed_sem = asyncio.Semaphore(SEED_CONCURRENCY)
+
+    async def _seed_symbol(sym: str):
+        async with seed_sem:
+            rows = await ctx.exchange.fetch_ohlcv(sym, timeframe=TIMEFRAME, limit=market_data.maxlen)
+        if not rows:
+            log.warning("Initial OHLCV fetch failed for %s", sym)
+            return
+        market_data.seed_array(sym, np.asarray(rows, dtype=np.float64))
+
+    await asyncio.gather(*(_seed_symbol(s) for s in symbols))
 
-    order = order_manager.place_order(symbol, decision["side"], decision["qty"], decision["price"], sl=decision["sl"], tp=decision["tp"])
-    logger.info("Order placed: %s", order)
 
-    # If live mode, set leverage and margin mode for each symbol
-    if MODE == "live":
-        log.info(f"Setting leverage {LEVERAGE} and margin mode {MARGIN_MODE} for live trading")
-        for sym in symbols:
-            ctx.exchange.set_margin_mode(sym, MARGIN_MODE)
-            ctx.exchange.set_leverage(sym, LEVERAGE)
+async def trading_loop():
+    _pin_cpu()
+    ctx = Context()
+    background: List[asyncio.Task] = []
+    try:
+        await ctx.start()
+        symbols = await ctx.exchange.fetch_usdt_perp_symbols(min_volume=MIN_24H_VOLUME_USDT, max_symbols=MAX_SYMBOLS)
+        if not symbols:
+            log.error("No USDT perpetual symbols above %.0f USDT of 24h volume", MIN_24H_VOLUME_USDT)
+            return
 
-    async def commands_poller():
-        async def _handle(cmd: str):
-            await handle_command(cmd, ctx)
-        await poll_commands(_handle)
+        if MODE == "live":
+            await _setup_live_symbols(ctx, symbols)
 
-    asyncio.create_task(commands_poller())
+        # Market data: one kline WebSocket for the whole universe, seeded once via REST
+        # paper: las salidas simuladas usan el precio del último trade (aggTrade) en memoria
+        ctx.market_data = MarketDataCache(symbols, TIMEFRAME, testnet=USE_TESTNET, agg_trades=MODE == "paper")
+        await _seed_market_data(ctx, symbols)
+        # (symbol, vela, open/high/low/close/volume) para evaluar la estrategia en bloque
+        ctx.ohlcv_buf = np.empty((len(ctx.market_data.symbols), ctx.market_data.maxlen, 5), dtype=np.float64)
+
+        async def commands_poller():
+            async def _handle(cmd: str):
+                await handle_command(cmd, ctx)
+            await poll_commands(_handle)
+
+        background.append(asyncio.create_task(commands_poller()))
+        background.append(asyncio.create_task(ctx.market_data.run()))
+        ctx.balance_writer.start()
+
+        if TOP_K_SELECTION:
+            await _top_k_loop(ctx, symbols)
+        else:
+            # Legacy: decidir y operar en etapas solapadas; el stream de klines es el productor
+            decided_q: asyncio.Queue = asyncio.Queue(maxsize=DECIDED_QUEUE_MAXSIZE)
+            in_flight: set = set()
+            halted = asyncio.Event()  # límite diario alcanzado: los traders dejan de abrir
+            await asyncio.gather(
+                _decider(ctx, decided_q, in_flight, halted),
+                *(_trader(ctx, decided_q, in_flight, halted) for _ in range(SYMBOL_CONCURRENCY)),
+            )
+    finally:
+        if getattr(ctx, "market_data", None) is not None:
+            ctx.market_data.stop()
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        # los balances aún en cola se escriben antes de salir (Ctrl+C / cancelación)
+        await ctx.balance_writer.close()
+        await ctx.close()
+        await close_telegram()
+
+
+async def _wait_next_candle(ctx: Context, timeout: float):
+    """Hasta el próximo cierre de vela del stream (agrupando el universo); `timeout` por si
+    el stream está caído, para que el loop no se quede parado."""
+    try:
+        await asyncio.wait_for(ctx.market_data.wait_closed(CANDLE_CLOSE_SETTLE_SEC), timeout)
+    except asyncio.TimeoutError:
+        log.debug("No candle close within %.0fs, running cycle anyway", timeout)
+
+
+def _top_k_candidates(ctx: Context, ranked: List[Tuple[str, float]]) -> list:
+    """(symbol, decision, price, score) de los símbolos seleccionados con señal, evaluados
+    sobre las velas del stream (sin REST)."""
+    market_data = ctx.market_data
+    out = []
+    for sym, score in ranked:
+        decision = decide_trade_array(market_data.last_rows(sym, market_data.maxlen))
+        price = market_data.last_close(sym)
+        if decision.signal == "hold" or math.isnan(price):
+            continue
+        out.append((sym, decision, price, score))
+    return out
+
+
+def _selection_summary(candidates: list, n_symbols: int) -> str:
+    picks = ", ".join(f"{sym} {d.signal.upper()} ({score:.3f})" for sym, d, _, score in candidates)
+    return _MSG_SELECTION % (len(candidates), n_symbols, picks)
+
+
+async def _top_k_loop(ctx: Context, symbols: list):
+    """Modo top-K: cada ciclo selecciona los mejores símbolos y los opera en secuencia."""
+    # fixed for the whole run: bind once instead of global/attribute lookups per trade
+    pos_pct = POSITION_SIZE_PERCENT
+    offer_balance = ctx.balance_writer.offer
+    # un ciclo por vela: antes del cierre los datos no cambian y repetir la selección no aporta
+    candle_timeout = timeframe_ms(TIMEFRAME) / 1000 + 5.0
 
     while True:
         try:
-            ctx.state = reset_if_new_day(ctx.state)
-            can_trade = can_open_new_trades(ctx.state)
-
-            if not can_trade:
+            ctx.invalidate_balance()
+            if not ctx.roll_day():
                 log.debug("Cannot trade (daily limits or paused)")
                 await asyncio.sleep(SLEEP_SECONDS_BETWEEN_CYCLES)
                 continue
 
-            # Use top-K selection if enabled, otherwise use legacy behavior
-            if TOP_K_SELECTION:
-                # Get top K symbols using new selection logic
-                selected_candidates = ctx.pair_selector.select_top_symbols(
-                    symbols, POSITION_SIZE_PERCENT, MAX_ACTIVE_SYMBOLS
-                )
-                
-                # Send single Telegram message with selection summary
-                summary = ctx.pair_selector.format_selection_summary(selected_candidates, len(symbols))
-                if selected_candidates:  # Only send if we have selections
-                    await send_message(summary)
-                
-                # Trade only the selected symbols
-                for candidate in selected_candidates:
-                    if not can_open_new_trades(ctx.state):
+            # Get top K symbols using new selection logic
+            ranked = await ctx.pair_selector.select_top_symbols_async(symbols, pos_pct, MAX_ACTIVE_SYMBOLS)
+            selected_candidates = _top_k_candidates(ctx, ranked)
+
+            if not selected_candidates:
+                await _wait_next_candle(ctx, candle_timeout)
+                continue
+
+            # selection summary + every fill of the cycle are queued together at the end, so the
+            # outbox coalesces them into a single sendMessage (split only past 4096 chars)
+            cycle_msgs = [_selection_summary(selected_candidates, len(symbols))]
+            try:
+                # Trade only the selected symbols; sizing only changes after a fill/PnL update
+                notional = await ctx.aget_equity() * pos_pct
+                for sym, decision, price, _ in selected_candidates:
+                    if not ctx.can_trade:
                         break
-                    
-                    sym = candidate.symbol
-                    side = "buy" if candidate.signal == "buy" else "sell"
-                    px = candidate.last_price
-                    
-                    order = ctx.om.open_position_market(sym, side, POSITION_SIZE_PERCENT, price_hint=px)
-
-                    if MODE == "live":
-                        # Live mode: use bracket orders with SL/TP from strategy
-                        sl_price = candidate.sl
-                        tp_price = candidate.tp
-                        # Compute amount in base from equity and price
-                        amount = (ctx.get_equity() * POSITION_SIZE_PERCENT) / px
-                        # Place bracket orders
-                        ctx.om.place_brackets(sym, side, amount, sl_price, tp_price)
-                        
-                        await send_message(f"{sym} {side.upper()} @ {px:.2f} | SL {sl_price:.2f} | TP {tp_price:.2f}")
-                    else:
-                        # Paper mode: keep current simulated quick exit logic
-                        await asyncio.sleep(2)
-                        df2 = ctx.exchange.fetch_ohlcv_df(sym, timeframe=TIMEFRAME, limit=2)
-                        if df2.empty:
-                            continue
-                        px2 = float(df2["close"].iloc[-1])
-                        amount_usd = ctx.get_equity() * POSITION_SIZE_PERCENT
-                        gross_pnl = (px2 - px) * (1 if side == "buy" else -1) * (amount_usd / px)
-                        fees = amount_usd * 0.0004  # ida+vuelta aprox
-                        net_pnl = gross_pnl - fees
-
-                        ctx.equity_usdt += net_pnl
-                        ctx.state = update_pnl(ctx.state, net_pnl)
-                        
-                        await send_message(f"{sym} {side.upper()} @ {px:.2f} -> exit {px2:.2f} | PnL: {net_pnl:.2f} USDT | PnL día: {ctx.state.pnl_today:.2f}")
-
-                    save_balance(ctx.get_equity())
-                    
-            else:
-                # Legacy behavior: iterate through all symbols
-                for sym in symbols:
-                    df = ctx.exchange.fetch_ohlcv_df(sym, timeframe=TIMEFRAME, limit=200)
-                    if df.empty or len(df) < 30:
-                        continue
 
-                    px = float(df["close"].iloc[-1])
-                    sig = decide_signal(df)
-                    if not can_trade or sig == "hold":
-                        continue
+                    # live: SL/TP que calculó la estrategia
+                    await open_trade(sym, decision.signal, price, notional, ctx, decision.sl, decision.tp, cycle_msgs)
+
+                    equity = await ctx.aget_equity()
+                    offer_balance(equity)
+                    notional = equity * pos_pct
+            finally:
+                # a mid-cycle error must not swallow the fills already reported
+                for msg in cycle_msgs:
+                    await send_message(msg)
 
-                    side = "buy" if sig == "buy" else "sell"
-                    order = ctx.om.open_position_market(sym, side, POSITION_SIZE_PERCENT, price_hint=px)
-
-                    if MODE == "live":
-                        # Live mode: use bracket orders with SL/TP
-                        sl_price, tp_price = compute_sl_tp(px, side, sl_pct=0.002, tp_pct=0.004)
-                        # Compute amount in base from equity and price
-                        amount = (ctx.get_equity() * POSITION_SIZE_PERCENT) / px
-                        # Place bracket orders
-                        ctx.om.place_brackets(sym, side, amount, sl_price, tp_price)
-                        
-                        await send_message(f"{sym} {side.upper()} @ {px:.2f} | SL {sl_price:.2f} | TP {tp_price:.2f}")
-                    else:
-                        # Paper mode: keep current simulated quick exit logic
-                        await asyncio.sleep(2)
-                        df2 = ctx.exchange.fetch_ohlcv_df(sym, timeframe=TIMEFRAME, limit=2)
-                        if df2.empty:
-                            continue
-                        px2 = float(df2["close"].iloc[-1])
-                        amount_usd = ctx.get_equity() * POSITION_SIZE_PERCENT
-                        gross_pnl = (px2 - px) * (1 if side == "buy" else -1) * (amount_usd / px)
-                        fees = amount_usd * 0.0004  # ida+vuelta aprox
-                        net_pnl = gross_pnl - fees
-
-                        ctx.equity_usdt += net_pnl
-                        ctx.state = update_pnl(ctx.state, net_pnl)
-                        
-                        await send_message(f"{sym} {side.upper()} @ {px:.2f} -> exit {px2:.2f} | PnL: {net_pnl:.2f} USDT | PnL día: {ctx.state.pnl_today:.2f}")
-
-                    save_balance(ctx.get_equity())
-                    can_trade = can_open_new_trades(ctx.state)
-
-            await asyncio.sleep(SLEEP_SECONDS_BETWEEN_CYCLES)
+            await _wait_next_candle(ctx, candle_timeout)
         except Exception as e:
-            log.exception(f"Loop error: {e}")
+            log.exception("Loop error: %s", e)
             await asyncio.sleep(2)
 
 if __name__ == "__main__":
-    logger.info("Starting bot (demo run)")
-    run_once()
\ No newline at end of file
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:  # Windows / entorno sin uvloop: event loop por defecto
+        pass
+    log.info("Starting bot (mode=%s)", MODE)
+    asyncio.run(trading_loop())
\ No newline at end of file
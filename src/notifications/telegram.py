@@ -2,10 +2,15 @@
 import logging
 import aiohttp
 from typing import Optional
-from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from src.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+# one keep-alive pool to api.telegram.org for every notifier in the bot
+from src.notifier.telegram_notifier import _get_session, close_session as close_telegram
+
+__all__ = ["send_telegram_message", "close_telegram"]
 
 logger = logging.getLogger(__name__)
 
+
 async def send_telegram_message(text: str, parse_mode: str = "HTML") -> Optional[dict]:
     """Send a message to configured Telegram chat. Returns API response dict or None on failure."""
     token = TELEGRAM_BOT_TOKEN
@@ -18,12 +23,11 @@ async def send_telegram_message(text: str, parse_mode: str = "HTML") -> Optional
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode, "disable_web_page_preview": True}
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, timeout=10) as resp:
-                data = await resp.json()
-                if not data.get("ok"):
-                    logger.error("Telegram API error: %s", data)
-                return data
+        async with _get_session().post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            data = await resp.json()
+            if not data.get("ok"):
+                logger.error("Telegram API error: %s", data)
+            return data
     except Exception as e:
         logger.exception("Failed to send telegram message: %s", e)
         return None
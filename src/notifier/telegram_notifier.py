@@ -3,9 +3,58 @@ import logging
 from typing import Optional
 import aiohttp
 import time
+from src.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 
 logger = logging.getLogger(__name__)
 
+BASE_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
+
+# Shared keep-alive session for the module-level send_message(): one pooled HTTPS
+# connection instead of a new session (and TLS handshake) per message.
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    # no await between the check and the assignment: no lock needed on the event loop
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=5),
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=60),
+        )
+    return _session
+
+
+async def send_message(text: str) -> bool:
+    """
+    Send `text` to the configured chat (TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID) right away.
+    Returns True on success; errors are logged, never raised.
+    """
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        logger.debug("Telegram not configured, skipping message: %s", text)
+        return False
+    payload = {"chat_id": TELEGRAM_CHAT_ID, "text": text}
+    try:
+        async with _get_session().post(f"{BASE_URL}/sendMessage", json=payload) as resp:
+            if resp.status != 200:
+                logger.warning("Telegram API error (status=%s): %s", resp.status, await resp.text())
+                return False
+            return True
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("Telegram send exception: %s", e)
+        return False
+
+
+async def close_session():
+    """Close the shared session used by send_message(); await it on shutdown."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
 class TelegramNotifier:
     """
     Async Telegram notifier with rate limiting and Retry-After handling.
@@ -14,8 +63,17 @@ class TelegramNotifier:
       n = TelegramNotifier(token, chat_id, rate_limit_per_min=30)
       await n.send_message("hola")
       await n.close()
+
+    Sends go through the module's shared keep-alive session (same pool as send_message()).
+    close() only stops this instance's worker; the shared session is closed once, at process
+    shutdown, with close_session().
     """
 
+    __slots__ = (
+        "token", "chat_id", "rate_limit_per_min", "_delay", "_queue", "_worker_task", "_closed",
+        "_consecutive_failures", "_max_consecutive_failures", "_disabled_until", "_reenable_after",
+    )
+
     def __init__(
         self,
         token: str,
@@ -29,7 +87,6 @@ class TelegramNotifier:
         self.rate_limit_per_min = max(1, rate_limit_per_min)
         self._delay = 60.0 / self.rate_limit_per_min  # seconds between messages
         self._queue: asyncio.Queue[str] = asyncio.Queue()
-        self._session: Optional[aiohttp.ClientSession] = None
         self._worker_task: Optional[asyncio.Task] = None
         self._closed = False
         self._consecutive_failures = 0
@@ -40,13 +97,8 @@ class TelegramNotifier:
 
     def _start_worker(self):
         if self._worker_task is None:
-            self._session = aiohttp.ClientSession()
             self._worker_task = asyncio.create_task(self._worker())
 
-    async def _ensure_session(self):
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-
     async def send_message(self, text: str):
         """
         Public: enqueue a telegram message. Returns immediately.
@@ -61,12 +113,11 @@ class TelegramNotifier:
         Try to send a message; return True on success, False on permanent failure.
         On 429 it will raise an exception to be handled by worker (which will sleep).
         """
-        await self._ensure_session()
         url = f"https://api.telegram.org/bot{self.token}/sendMessage"
         payload = {"chat_id": self.chat_id, "text": text}
         headers = {"Content-Type": "application/json"}
         try:
-            async with self._session.post(url, json=payload, headers=headers, timeout=15) as resp:
+            async with _get_session().post(url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as resp:
                 text_body = await resp.text()
                 if resp.status == 200:
                     self._consecutive_failures = 0
@@ -173,5 +224,3 @@ class TelegramNotifier:
                 await self._worker_task
             except asyncio.CancelledError:
                 pass
-        if self._session:
-            await self._session.close()
@@ -1,16 +1,28 @@
 """
 Pair Selector module.
 Selecciona los mejores pares para operar en Binance Futures (Testnet/Real).
-Asíncrono, optimizado para trabajar dentro del event loop.
+Asíncrono, pensado para el event loop sobre el BinanceClient async.
+
+Lo usa el modo top-K de src/main.py; unified_main.py filtra por cambio 24h.
 """
 
 import logging
+import time
 import pandas as pd
 import asyncio
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
+from src.fetcher import timeframe_ms
 
 logger = logging.getLogger(__name__)
 
+# variación mínima del último precio (desde el último análisis) para volver a pedir velas
+SCREEN_MIN_MOVE = 0.001
+# fetch de velas en vuelo a la vez; el resto espera en el semáforo en lugar de encolarse
+# todos de golpe en el rate limiter y el pool HTTP
+ANALYZE_CONCURRENCY = 10
+ANALYZE_TIMEFRAME = "1m"
+ANALYZE_BARS = 200
+
 
 class PairSelector:
     def __init__(self, exchange):
@@ -19,6 +31,62 @@ class PairSelector:
         :param exchange: Cliente de exchange (BinanceClient)
         """
         self.exchange = exchange
+        # estado del cribado: precio y score del último análisis completo de cada símbolo
+        self._analyzed_price: Dict[str, float] = {}
+        self._scores: Dict[str, float] = {}
+        self._analyze_sem: Optional[asyncio.Semaphore] = None
+        # últimas ANALYZE_BARS velas por símbolo; entre pasadas solo se piden las nuevas
+        self._bars: Dict[str, List[list]] = {}
+
+    async def _symbols_to_analyze(self, symbols: List[str], active: Iterable[str]) -> List[str]:
+        """
+        Criba con una sola llamada de precios para todo el mercado: solo se piden velas de
+        los símbolos cuyo precio se ha movido más de SCREEN_MIN_MOVE desde su último
+        análisis, de los que no tienen score y de los que se están operando.
+        """
+        prices = await self.exchange.fetch_all_last_prices()
+        if not prices:
+            return list(symbols)
+        active = set(active)
+        out = []
+        for sym in symbols:
+            px = prices.get(self.exchange.market_id(sym))
+            prev = self._analyzed_price.get(sym)
+            if (
+                sym in active
+                or sym not in self._scores
+                or px is None
+                or not prev
+                or abs(px / prev - 1.0) > SCREEN_MIN_MOVE
+            ):
+                out.append(sym)
+                if px is not None:
+                    self._analyzed_price[sym] = px
+        return out
+
+    async def _fetch_bars(self, symbol: str) -> Optional[List[list]]:
+        """
+        Últimas ANALYZE_BARS velas de symbol. La primera vez (o tras un hueco mayor que la
+        ventana) se piden todas; después solo desde la última guardada, que puede seguir
+        abierta y se reemplaza.
+        """
+        cached = self._bars.get(symbol)
+        tf_ms = timeframe_ms(ANALYZE_TIMEFRAME)
+        missing = 0
+        if cached:
+            last_ts = int(cached[-1][0])
+            missing = int(time.time() * 1000 - last_ts) // tf_ms + 1
+        if not cached or missing >= ANALYZE_BARS:
+            rows = await self.exchange.fetch_ohlcv(symbol, timeframe=ANALYZE_TIMEFRAME, limit=ANALYZE_BARS)
+            if rows:
+                self._bars[symbol] = rows = rows[-ANALYZE_BARS:]
+            return rows
+        rows = await self.exchange.fetch_ohlcv(symbol, timeframe=ANALYZE_TIMEFRAME, since=last_ts, limit=missing + 1)
+        if not rows:
+            return cached
+        merged = [r for r in cached if r[0] < rows[0][0]] + rows
+        self._bars[symbol] = merged = merged[-ANALYZE_BARS:]
+        return merged
 
     async def analyze_symbol(self, symbol: str, position_size_percent: float) -> Optional[Tuple[str, float]]:
         """
@@ -26,7 +94,7 @@ class PairSelector:
         Retorna (symbol, score) o None si falla.
         """
         try:
-            raw = await self.exchange.fetch_ohlcv(symbol, timeframe="1m", limit=200)
+            raw = await self._fetch_bars(symbol)
             if not raw:
                 return None
 
@@ -35,7 +103,8 @@ class PairSelector:
 
             # Métricas simples
             df["returns"] = df["close"].pct_change()
-            momentum = df["close"].iloc[-1] / df["close"].iloc[0] - 1
+            close = df["close"].to_numpy()
+            momentum = close[-1] / close[0] - 1
             volatility = df["returns"].std()
 
             # Score simple: momentum positivo y volatilidad moderada
@@ -51,25 +120,38 @@ class PairSelector:
         self,
         symbols: List[str],
         position_size_percent: float,
-        max_symbols: int = 3
+        max_symbols: int = 3,
+        active: Iterable[str] = (),
     ) -> List[Tuple[str, float]]:
         """
         Analiza múltiples símbolos de forma asíncrona y selecciona los mejores.
         :param symbols: lista de símbolos (ej. ["BTC/USDT", "ETH/USDT"])
         :param position_size_percent: % del capital por trade
         :param max_symbols: número máximo de símbolos a devolver
+        :param active: símbolos con posición abierta (siempre se re-analizan)
         :return: lista [(symbol, score), ...] ordenada por score
         """
-        tasks = [
-            self.analyze_symbol(sym, position_size_percent)
-            for sym in symbols
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        candidates = []
-        for res in results:
+        to_analyze = await self._symbols_to_analyze(symbols, active)
+        if self._analyze_sem is None:
+            self._analyze_sem = asyncio.Semaphore(ANALYZE_CONCURRENCY)
+        sem = self._analyze_sem
+
+        async def _bounded(sym: str):
+            async with sem:
+                return await self.analyze_symbol(sym, position_size_percent)
+
+        results = await asyncio.gather(*(_bounded(sym) for sym in to_analyze), return_exceptions=True)
+
+        for sym, res in zip(to_analyze, results):
             if isinstance(res, tuple) and len(res) == 2:
-                candidates.append(res)
+                self._scores[sym] = res[1]
+            else:
+                # sin score fiable: que se vuelva a intentar en la próxima pasada
+                self._scores.pop(sym, None)
+                self._analyzed_price.pop(sym, None)
+        logger.debug("Pair screening: %d/%d symbols re-analyzed", len(to_analyze), len(symbols))
+
+        candidates = [(sym, self._scores[sym]) for sym in symbols if sym in self._scores]
 
         # Ordenar por score descendente
         candidates.sort(key=lambda x: x[1], reverse=True)
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+from src.config import DB_PATH
+from src.persistence.sqlite_store import _connect, _ensure_db
+
+logger = logging.getLogger(__name__)
+
+_STOP = None  # centinela de close(): _run escribe lo que lleva y termina
+
+
+class BalanceBatchWriter:
+    """Coalesces balance snapshots and writes them in one short transaction.
+
+    offer() is a non-blocking put_nowait from the trading loop; a background task drains
+    up to `max_batch` points (or whatever arrived within `flush_interval` seconds) and
+    commits them with a single executemany, off the event loop thread.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        max_batch: int = 500,
+        flush_interval: float = 2.0,
+        checkpoint_rows: int = 5000,
+        min_change: float = 0.005,
+    ):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        # tras este nº de filas escritas se trunca el WAL para que no crezca sin límite
+        self.checkpoint_rows = checkpoint_rows
+        self._rows_since_checkpoint = 0
+        # un balance que no cambia al menos esto respecto al último encolado no se escribe
+        self.min_change = min_change
+        self._last_offered: Optional[float] = None
+        self._queue: asyncio.Queue[Optional[Tuple[int, float]]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # una sola conexión para toda la vida del writer (solo la usa el hilo de _write de turno)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def start(self):
+        if self._task is None:
+            _ensure_db()
+            self._task = asyncio.create_task(self._run())
+
+    def offer(self, balance_usdt: float):
+        balance_usdt = float(balance_usdt)
+        if self._last_offered is not None and abs(balance_usdt - self._last_offered) < self.min_change:
+            return
+        self._last_offered = balance_usdt
+        self._queue.put_nowait((int(time.time()), balance_usdt))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                logger.warning("Balance batch write failed (%d rows): %s", len(batch), e)
+
+    def _write(self, rows: List[Tuple[int, float]]):
+        if self._conn is None:
+            self._conn = _connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn = self._conn
+        # keep the write lock only for the duration of one small insert batch
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT INTO balances (ts, balance_usdt) VALUES (?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._rows_since_checkpoint += len(rows)
+        if self._rows_since_checkpoint >= self.checkpoint_rows:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._rows_since_checkpoint = 0
+
+    async def close(self):
+        """Flushes anything still queued and stops the background task."""
+        if self._task is not None and not self._task.done():
+            # the sentinel goes in behind every offered row: _run writes them all (including the
+            # batch it is holding) and exits; never cancelled mid-batch, so _write never overlaps
+            self._queue.put_nowait(_STOP)
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        # writer never started (or its task died): whatever is queued is written here
+        pending = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                pending.append(item)
+        if pending:
+            await asyncio.to_thread(self._write, pending)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,12 +1,57 @@
 import os
 import sqlite3
+import threading
 import time
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 from src.config import DB_PATH, DATA_DIR
 
+# Pragmas por conexión: synchronous=NORMAL en WAL solo hace fsync en checkpoints, no en cada commit
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# Conexión compartida del proceso: abrir db/-wal/-shm y calentar la caché en cada save es
+# más caro que el propio INSERT. check_same_thread=False porque se usa desde el pool de
+# hilos; el lock serializa su uso.
+_shared_conn: Optional[sqlite3.Connection] = None
+_shared_lock = threading.Lock()
+_db_ready = False
+
+def _connect(db_path: str = DB_PATH, **kwargs) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, **kwargs)
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_connection() -> sqlite3.Connection:
+    """Conexión de larga vida a DB_PATH (esquema ya creado). Usar bajo `_shared_lock`."""
+    global _shared_conn
+    if _shared_conn is None:
+        _ensure_db()
+        _shared_conn = _connect(check_same_thread=False)
+    return _shared_conn
+
+def close_connection():
+    global _shared_conn
+    with _shared_lock:
+        if _shared_conn is not None:
+            _shared_conn.close()
+            _shared_conn = None
+
 def _ensure_db():
+    """Crea el esquema la primera vez que se llama en el proceso; después no hace nada."""
+    global _db_ready
+    if _db_ready:
+        return
     os.makedirs(os.path.dirname(DB_PATH) or DATA_DIR, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
+    conn = _connect()
+    try:
+        # journal_mode es persistente en el fichero: basta con fijarlo una vez
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
         cur = conn.cursor()
         cur.execute("""
         CREATE TABLE IF NOT EXISTS orders (
@@ -29,13 +74,26 @@ def _ensure_db():
         )
         """
         )
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS symbol_config (
+            symbol TEXT NOT NULL,
+            testnet INTEGER NOT NULL,
+            margin TEXT NOT NULL,
+            leverage INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            PRIMARY KEY (symbol, testnet)
+        )
+        """
+        )
         conn.commit()
+    finally:
+        conn.close()
+    _db_ready = True
 
 def save_order(symbol: str, side: str, price: float, qty: float, fee: float, status: str):
-    _ensure_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.cursor(
-        )
+    with _shared_lock:
+        conn = get_connection()
+        cur = conn.cursor()
         cur.execute(
             "INSERT INTO orders (ts, symbol, side, price, qty, fee, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
             (int(time.time()), symbol, side, float(price), float(qty), float(fee), status),
@@ -43,11 +101,36 @@ def save_order(symbol: str, side: str, price: float, qty: float, fee: float, sta
         conn.commit()
 
 def save_balance(balance_usdt: float):
-    _ensure_db()
-    with sqlite3.connect(DB_PATH) as conn:
+    with _shared_lock:
+        conn = get_connection()
         cur = conn.cursor()
         cur.execute(
             "INSERT INTO balances (ts, balance_usdt) VALUES (?, ?)",
             (int(time.time()), float(balance_usdt)),
         )
         conn.commit()
+
+def load_symbol_config(testnet: bool) -> Dict[str, Tuple[str, int]]:
+    """symbol -> (margin, leverage) ya aplicados en el exchange (testnet y real por separado)."""
+    with _shared_lock:
+        conn = get_connection()
+        rows = conn.execute(
+            "SELECT symbol, margin, leverage FROM symbol_config WHERE testnet = ?", (int(testnet),)
+        ).fetchall()
+    return {sym: (margin, int(leverage)) for sym, margin, leverage in rows}
+
+def save_symbol_config(testnet: bool, entries: Iterable[Tuple[str, str, int]]):
+    """Upsert de (symbol, margin, leverage) en una sola transacción."""
+    ts = int(time.time())
+    rows = [(sym, int(testnet), margin, int(leverage), ts) for sym, margin, leverage in entries]
+    if not rows:
+        return
+    with _shared_lock:
+        conn = get_connection()
+        conn.executemany(
+            "INSERT INTO symbol_config (symbol, testnet, margin, leverage, ts) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(symbol, testnet) DO UPDATE SET margin = excluded.margin, "
+            "leverage = excluded.leverage, ts = excluded.ts",
+            rows,
+        )
+        conn.commit()
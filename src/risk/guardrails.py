@@ -43,7 +43,7 @@ class RiskGuardrails:
         """Reset daily tracking if it's a new day."""
         today = date.today()
         if self.state.last_reset_date != today:
-            log.info(f"New trading day detected, resetting daily risk tracking")
+            log.info("New trading day detected, resetting daily risk tracking")
             self.state.daily_pnl = 0.0
             self.state.trade_count_today = 0
             self.state.max_daily_loss_hit = False
@@ -57,30 +57,30 @@ class RiskGuardrails:
             Dict with 'allowed' bool and optional 'reason' string
         """
         self._reset_if_new_day()
-        plan = self.plan_loader.get_plan()
+        risk = self.plan_loader.get_plan().risk
 
         # Check max concurrent positions
-        if context.current_positions >= plan.risk.max_concurrent_positions:
+        if context.current_positions >= risk.max_concurrent_positions:
             return {
                 'allowed': False,
-                'reason': f'Max concurrent positions reached ({plan.risk.max_concurrent_positions})'
+                'reason': f'Max concurrent positions reached ({risk.max_concurrent_positions})'
             }
 
         # Check max daily loss
-        max_daily_loss_usd = context.equity_usd * (plan.risk.max_daily_loss_pct / 100.0)
+        max_daily_loss_usd = context.equity_usd * (risk.max_daily_loss_pct / 100.0)
         if self.state.daily_pnl <= -max_daily_loss_usd:
             self.state.max_daily_loss_hit = True
             return {
                 'allowed': False,
-                'reason': f'Max daily loss reached ({plan.risk.max_daily_loss_pct}%)'
+                'reason': f'Max daily loss reached ({risk.max_daily_loss_pct}%)'
             }
 
         # Check position size against max risk per trade
-        max_risk_usd = context.equity_usd * (plan.risk.max_risk_per_trade_pct / 100.0)
+        max_risk_usd = context.equity_usd * (risk.max_risk_per_trade_pct / 100.0)
         if context.position_size_usd > max_risk_usd:
             return {
                 'allowed': False,
-                'reason': f'Position size exceeds max risk per trade ({plan.risk.max_risk_per_trade_pct}%)'
+                'reason': f'Position size exceeds max risk per trade ({risk.max_risk_per_trade_pct}%)'
             }
 
         # All checks passed
@@ -91,7 +91,7 @@ class RiskGuardrails:
         self._reset_if_new_day()
         self.state.current_positions += 1
         self.state.trade_count_today += 1
-        log.info(f"Trade opened: {context.symbol} {context.side}, positions: {self.state.current_positions}")
+        log.info("Trade opened: %s %s, positions: %s", context.symbol, context.side, self.state.current_positions)
 
     def on_trade_closed(self, symbol: str, pnl_usd: float) -> None:
         """Update state when a trade is closed."""
@@ -103,7 +103,7 @@ class RiskGuardrails:
         # Update daily PnL
         self.state.daily_pnl += pnl_usd
         
-        log.info(f"Trade closed: {symbol}, PnL: ${pnl_usd:.2f}, Daily PnL: ${self.state.daily_pnl:.2f}, positions: {self.state.current_positions}")
+        log.info("Trade closed: %s, PnL: $%.2f, Daily PnL: $%.2f, positions: %s", symbol, pnl_usd, self.state.daily_pnl, self.state.current_positions)
 
     def validate_position_size(self, equity_usd: float, requested_pct: float) -> float:
         """
@@ -116,22 +116,22 @@ class RiskGuardrails:
         Returns:
             Adjusted position size percentage (0-1 decimal)
         """
-        plan = self.plan_loader.get_plan()
+        risk = self.plan_loader.get_plan().risk
         
         # Convert to decimal if needed
         if requested_pct >= 1:
             requested_pct = requested_pct / 100.0
         
         # Cap at plan maximum
-        max_size_pct = plan.risk.position_size_pct / 100.0
+        max_size_pct = risk.position_size_pct / 100.0
         if requested_pct > max_size_pct:
-            log.warning(f"Requested position size {requested_pct*100:.2f}% exceeds plan maximum {plan.risk.position_size_pct}%, capping")
+            log.warning("Requested position size %.2f%% exceeds plan maximum %s%%, capping", requested_pct*100, risk.position_size_pct)
             requested_pct = max_size_pct
         
         # Ensure it doesn't exceed max risk per trade
-        max_risk_pct = plan.risk.max_risk_per_trade_pct / 100.0
+        max_risk_pct = risk.max_risk_per_trade_pct / 100.0
         if requested_pct > max_risk_pct:
-            log.warning(f"Requested position size {requested_pct*100:.2f}% exceeds max risk per trade {plan.risk.max_risk_per_trade_pct}%, capping")
+            log.warning("Requested position size %.2f%% exceeds max risk per trade %s%%, capping", requested_pct*100, risk.max_risk_per_trade_pct)
             requested_pct = max_risk_pct
         
         return requested_pct
@@ -182,7 +182,7 @@ class RiskGuardrails:
             }
             
         except Exception as e:
-            log.error(f"Error checking exchange filters for {symbol}: {e}")
+            log.error("Error checking exchange filters for %s: %s", symbol, e)
             return {
                 'valid': False,
                 'reason': f'Filter validation error: {e}',
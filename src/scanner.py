@@ -15,18 +15,9 @@ async def fetch_all_symbols(exchange_client) -> List[str]:
     """Devuelve lista de símbolos para futuros USDT-M (filtrados por quote USDT)."""
     try:
         markets = await exchange_client.exchange.load_markets()
-        # markets is dict: symbol -> market
-        res = []
-        for sym, info in markets.items():
-            try:
-                # keep only USDT-M futures typical symbols like BTC/USDT
-                if info.get("future") or info.get("type") == "future" or "USDT" in sym:
-                    # enforce symbol format like "BTC/USDT"
-                    if sym.endswith("/USDT"):
-                        res.append(sym)
-            except Exception:
-                continue
-        return sorted(list(set(res)))
+        # markets is dict: symbol -> market. The "BTC/USDT" suffix already implies a USDT
+        # quote, so one suffix test per key is the whole filter (keys are unique: no set)
+        return sorted(sym for sym in markets if isinstance(sym, str) and sym.endswith("/USDT"))
     except Exception as e:
         logger.exception("fetch_all_symbols error: %s", e)
         return []
@@ -38,7 +29,7 @@ def compute_atr(df: pd.DataFrame, period: int = 14) -> float:
     tr3 = (df["low"] - df["close"].shift()).abs()
     tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
     atr = tr.rolling(period).mean()
-    return float(atr.iloc[-1]) if not atr.empty else 0.0
+    return float(atr.iat[-1]) if not atr.empty else 0.0
 
 async def symbol_24h_volume_usdt(exchange_client, symbol: str) -> float:
     """Try to read 24h quoteVolume or use ticker quoteVolume."""
@@ -65,7 +56,7 @@ async def symbol_atr_ratio(exchange_client, symbol: str, timeframe: str = "15m")
         df = pd.DataFrame(raw, columns=["ts", "open", "high", "low", "close", "volume"])
         df["close"] = pd.to_numeric(df["close"])
         atr = compute_atr(df, period=14)
-        last_close = float(df["close"].iloc[-1])
+        last_close = float(df["close"].to_numpy()[-1])
         return float(atr), last_close
     except Exception as e:
         logger.warning("symbol_atr_ratio error %s %s", symbol, e)
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Dict, Optional
 
 from src.ai import scorer
+from src.orders.manager import order_manager
 
 # Strategy: recibe features ya calculadas (dict) y decide acción.
 
@@ -35,9 +36,7 @@ def decide_trade(symbol: str, features: Dict[str, float], price: float, atr: flo
     if atr <= 0:
         atr = max(1.0, abs(price) * 0.001)
 
-    from src.orders.manager import OrderManager
-    om = OrderManager()
-    sl, tp = om.calculate_sl_tp(price, atr, "long" if side == "long" else "short", rr=1.5)
+    sl, tp = order_manager.calculate_sl_tp(price, atr, "long" if side == "long" else "short", rr=1.5)
 
     return {
         "side": side,
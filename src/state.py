@@ -38,10 +38,10 @@ class StateManager:
             "sl": sl,
             "tp": tp
         }
-        logger.info(f"📌 Posición abierta en {symbol}: {side} {size} @ {entry}, SL {sl}, TP {tp}")
+        logger.info("📌 Posición abierta en %s: %s %s @ %s, SL %s, TP %s", symbol, side, size, entry, sl, tp)
 
     def register_closed_position(self, symbol, pnl):
         if symbol in self.open_positions:
             del self.open_positions[symbol]
         self.realized_pnl_today += pnl
-        logger.info(f"✅ Operación cerrada en {symbol} con PnL {pnl:.2f} USDT (Total diario: {self.realized_pnl_today:.2f})")
+        logger.info("✅ Operación cerrada en %s con PnL %.2f USDT (Total diario: %.2f)", symbol, pnl, self.realized_pnl_today)
@@ -71,7 +71,7 @@ class StateManager:
             "created_at": datetime.datetime.utcnow(),
             "closed": False,
         }
-        logger.info(f"📌 Posición abierta en {symbol}: {side} {quantity} @ {entry}, SL {sl}, TP {tp}, orders: entry={entry_order_id} sl={sl_order_id} tp={tp_order_id}")
+        logger.info("📌 Posición abierta en %s: %s %s @ %s, SL %s, TP %s, orders: entry=%s sl=%s tp=%s", symbol, side, quantity, entry, sl, tp, entry_order_id, sl_order_id, tp_order_id)
 
     def update_entry_execution(self, symbol: str, filled: float, avg: Optional[float]):
         """
@@ -127,7 +127,7 @@ class StateManager:
         }
         self.closed_positions_history.append(record)
         self.realized_pnl_today += float(pnl)
-        logger.info(f"✅  Operación cerrada en {symbol} por {reason} con PnL {pnl:.2f} USDT (Total diario: {self.realized_pnl_today:.2f})")
+        logger.info("✅  Operación cerrada en %s por %s con PnL %.2f USDT (Total diario: %.2f)", symbol, reason, pnl, self.realized_pnl_today)
 
     def set_final_close_info(self, symbol: str, close_order_id: Optional[str], close_type: Optional[str], pnl: Optional[float]):
         """
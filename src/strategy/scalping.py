@@ -16,11 +16,11 @@ class ScalpingStrategy(Strategy):
         logging.info("==================== NUEVO CICLO DE ANÁLISIS ====================")
         for symbol in self.symbols:
             try:
-                logging.info(f"Analizando símbolo: {symbol}")
+                logging.info("Analizando símbolo: %s", symbol)
                 
                 klines = self.exchange.get_klines(symbol, self.timeframe, self.kline_limit)
                 if klines is None or len(klines) == 0:
-                    logging.warning(f"No se pudieron obtener datos (klines) para {symbol}. Saltando este ciclo.")
+                    logging.warning("No se pudieron obtener datos (klines) para %s. Saltando este ciclo.", symbol)
                     continue
 
                 df = self.data_handler.process_klines(klines)
@@ -28,15 +28,15 @@ class ScalpingStrategy(Strategy):
                 self.indicator_manager.add_indicators(df)
 
                 # Extraemos el último valor de los indicadores para que sea fácil de leer
-                last_close = df['close'].iloc[-1]
+                last_close = df['close'].iat[-1]
                 # Asegúrate de que la columna 'RSI' exista antes de acceder a ella
                 if 'RSI' not in df.columns:
-                    logging.error(f"La columna 'RSI' no se encontró en el DataFrame para {symbol}. Revisa tu 'indicator_manager'.")
+                    logging.error("La columna 'RSI' no se encontró en el DataFrame para %s. Revisa tu 'indicator_manager'.", symbol)
                     continue
-                last_rsi = df['RSI'].iloc[-1]
+                last_rsi = df['RSI'].iat[-1]
                 
                 # Mostramos los valores actuales en el log
-                logging.info(f"[{symbol}] Precio actual: {last_close:.4f}, RSI actual: {last_rsi:.2f}")
+                logging.info("[%s] Precio actual: %.4f, RSI actual: %.2f", symbol, last_close, last_rsi)
 
                 # --- Lógica de la estrategia ---
                 
@@ -49,21 +49,21 @@ class ScalpingStrategy(Strategy):
                 
                 # Evaluamos las condiciones y lo mostramos en el log
                 if enter_long_condition:
-                    logging.info(f"[{symbol}] CONDICIÓN DE COMPRA CUMPLIDA: RSI ({last_rsi:.2f}) < {rsi_buy_threshold}")
+                    logging.info("[%s] CONDICIÓN DE COMPRA CUMPLIDA: RSI (%.2f) < %s", symbol, last_rsi, rsi_buy_threshold)
                     # Descomenta la siguiente línea cuando estés seguro de que quieres operar
                     self.order_manager.place_order(symbol, 'BUY', self.quantity)
-                    logging.info(f"[{symbol}] SIMULANDO orden de COMPRA (la llamada real está comentada).")
+                    logging.info("[%s] SIMULANDO orden de COMPRA (la llamada real está comentada).", symbol)
 
                 elif enter_short_condition:
-                    logging.info(f"[{symbol}] CONDICIÓN de VENTA CUMPLIDA: RSI ({last_rsi:.2f}) > {rsi_sell_threshold}")
+                    logging.info("[%s] CONDICIÓN de VENTA CUMPLIDA: RSI (%.2f) > %s", symbol, last_rsi, rsi_sell_threshold)
                     # Descomenta la siguiente línea cuando estés seguro de que quieres operar
                     self.order_manager.place_order(symbol, 'SELL', self.quantity)
-                    logging.info(f"[{symbol}] SIMULANDO orden de VENTA (la llamada real está comentada).")
+                    logging.info("[%s] SIMULANDO orden de VENTA (la llamada real está comentada).", symbol)
 
                 else:
-                    logging.info(f"[{symbol}] No se cumplen condiciones. RSI ({last_rsi:.2f}) está entre {rsi_buy_threshold} y {rsi_sell_threshold}.")
+                    logging.info("[%s] No se cumplen condiciones. RSI (%.2f) está entre %s y %s.", symbol, last_rsi, rsi_buy_threshold, rsi_sell_threshold)
 
             except Exception as e:
-                logging.error(f"Ocurrió un error inesperado al analizar {symbol}: {e}")
+                logging.error("Ocurrió un error inesperado al analizar %s: %s", symbol, e)
         
         logging.info("==================== FIN DEL CICLO DE ANÁLISIS ====================\n")
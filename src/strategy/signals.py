@@ -1,11 +1,14 @@
 # src/strategy/signals.py
 """
 Indicator calculations and entry signal detection.
-EMA, RSI, ATR usage using pandas.
+EMA, RSI, ATR usage using pandas; trend_signal() is the array/JIT version of the
+EMA9/21 + RSI14 + EMA50(15m) entry rule for the per-symbol scan loop.
 """
+from typing import Optional
 
 import pandas as pd
 import numpy as np
+from src.utils._njit import njit
 
 def ema(series: pd.Series, span: int) -> pd.Series:
     return series.ewm(span=span, adjust=False).mean()
@@ -36,12 +39,12 @@ def compute_indicators(df_1m: pd.DataFrame, df_15m: pd.DataFrame) -> dict:
     close1 = pd.to_numeric(df_1m["close"])
     close15 = pd.to_numeric(df_15m["close"])
 
-    ema9 = ema(close1, 9).iloc[-1]
-    ema21 = ema(close1, 21).iloc[-1]
-    rsi14 = rsi(close1, 14).iloc[-1]
-    ema50_15 = ema(close15, 50).iloc[-1]
-    atr15 = atr(df_15m, 14).iloc[-1]
-    last_price = float(close1.iloc[-1])
+    ema9 = ema(close1, 9).iat[-1]
+    ema21 = ema(close1, 21).iat[-1]
+    rsi14 = rsi(close1, 14).iat[-1]
+    ema50_15 = ema(close15, 50).iat[-1]
+    atr15 = atr(df_15m, 14).iat[-1]
+    last_price = float(close1.iat[-1])
 
     return {
         "ema9": ema9,
@@ -52,6 +55,62 @@ def compute_indicators(df_1m: pd.DataFrame, df_15m: pd.DataFrame) -> dict:
         "last_price": last_price
     }
 
+@njit(cache=True)
+def _ewm_last(x, alpha, min_periods):
+    """Último valor de ewm(alpha, adjust=False); NaN con menos de min_periods valores."""
+    n = x.shape[0]
+    if n < min_periods or n == 0:
+        return np.nan
+    y = x[0]
+    for i in range(1, n):
+        y = (1.0 - alpha) * y + alpha * x[i]
+    return y
+
+
+@njit(cache=True)
+def _trend_signal_core(close_1m, close_15m):
+    """
+    Regla de entrada de analizar_signal sobre closes float64: 1 long, -1 short, 0 nada.
+    Reproduce los valores de ta (EMAIndicator / RSIIndicator con fillna=False).
+    """
+    n = close_1m.shape[0]
+    ema9 = _ewm_last(close_1m, 2.0 / 10.0, 9)
+    ema21 = _ewm_last(close_1m, 2.0 / 22.0, 21)
+    ema50_15m = _ewm_last(close_15m, 2.0 / 51.0, 50)
+    if n < 21 or ema50_15m != ema50_15m:
+        return 0
+
+    # RSI 14 (Wilder): la primera diferencia es 0 igual que diff().where(..., 0.0)
+    a = 1.0 / 14.0
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, n):
+        d = close_1m[i] - close_1m[i - 1]
+        gain = (1.0 - a) * gain + a * (d if d > 0.0 else 0.0)
+        loss = (1.0 - a) * loss + a * (-d if d < 0.0 else 0.0)
+    rsi14 = 100.0 if loss == 0.0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+    price = close_1m[n - 1]
+    if price > ema50_15m and ema9 > ema21 and rsi14 < 65.0:
+        return 1
+    if price < ema50_15m and ema9 < ema21 and rsi14 > 35.0:
+        return -1
+    return 0
+
+
+def trend_signal(close_1m: np.ndarray, close_15m: np.ndarray) -> Optional[str]:
+    """'long' / 'short' / None a partir de los closes de 1m y 15m (sin DataFrames)."""
+    code = _trend_signal_core(
+        np.ascontiguousarray(close_1m, dtype=np.float64),
+        np.ascontiguousarray(close_15m, dtype=np.float64),
+    )
+    if code > 0:
+        return "long"
+    if code < 0:
+        return "short"
+    return None
+
+
 def is_long_signal(indicators: dict) -> bool:
     return (indicators["last_price"] > indicators["ema50_15"] and
             indicators["ema9"] > indicators["ema21"] and
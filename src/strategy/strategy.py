@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, NamedTuple, Tuple
 from src.ai.scorer import scorer
+from src.utils._njit import NUMBA_AVAILABLE, njit, prange
 
 def compute_rsi(close: pd.Series, period: int = 14) -> pd.Series:
     delta = close.diff()
@@ -37,10 +38,10 @@ def build_features(df: pd.DataFrame) -> Dict[str, float]:
     _atr = atr(df, 14)
     _vwap = vwap(df, 30)
 
-    mom = ((fast - slow) / close).iloc[-1]
-    rsi_centered = ((r.iloc[-1] - 50.0) / 50.0)
-    vwap_dev = ((close.iloc[-1] - _vwap.iloc[-1]) / (_atr.iloc[-1] + 1e-9))
-    atr_regime = float((_atr.iloc[-1] / close.iloc[-1]))
+    mom = ((fast - slow) / close).iat[-1]
+    rsi_centered = ((r.iat[-1] - 50.0) / 50.0)
+    vwap_dev = ((close.iat[-1] - _vwap.iat[-1]) / (_atr.iat[-1] + 1e-9))
+    atr_regime = float((_atr.iat[-1] / close.iat[-1]))
     win = 5
     if len(close) >= win:
         y = close.iloc[-win:]
@@ -59,11 +60,11 @@ def build_features(df: pd.DataFrame) -> Dict[str, float]:
         "vwap_dev": vwap_dev,
         "atr_regime": atr_regime,
         "micro_trend": micro_trend,
-        "_atr": float(_atr.iloc[-1]),
-        "_close": float(close.iloc[-1]),
-        "_fast": float(fast.iloc[-1]),
-        "_slow": float(slow.iloc[-1]),
-        "_rsi": float(r.iloc[-1]),
+        "_atr": float(_atr.iat[-1]),
+        "_close": float(close.iat[-1]),
+        "_fast": float(fast.iat[-1]),
+        "_slow": float(slow.iat[-1]),
+        "_rsi": float(r.iat[-1]),
     }
 
 def compute_sl_tp_atr(price: float, atr_val: float, side: str) -> Tuple[float, float]:
@@ -76,30 +77,288 @@ def compute_sl_tp_atr(price: float, atr_val: float, side: str) -> Tuple[float, f
     else:
         return price * (1 + sl_dist / price), price * (1 - tp_dist / price)
 
-def decide_trade(ohlcv: pd.DataFrame) -> Dict[str, float | str]:
-    if ohlcv is None or len(ohlcv) < 30:
-        return {"signal": "hold", "sl": 0.0, "tp": 0.0, "score": 0.0}
+# Orden de las features en el vector de pesos que recibe el kernel
+FEATURE_NAMES = ("mom", "rsi_centered", "vwap_dev", "atr_regime", "micro_trend")
+SIGNAL_HOLD, SIGNAL_BUY, SIGNAL_SELL = 0, 1, 2
+MIN_BARS = 30  # velas mínimas para evaluar; por debajo siempre hold
+_SIGNALS = ("hold", "buy", "sell")
+# signo de la posición por SIGNAL_*: PnL = side_sign * (exit - entry) * notional / entry,
+# también aplicable a arrays (SIDE_SIGNS[signals]) en el camino batch
+SIDE_SIGNS = np.array([0.0, 1.0, -1.0], dtype=np.float64)
 
-    feats = build_features(ohlcv)
-    score = scorer.score(feats)
-    buy_th = 0.25
-    sell_th = -0.25
 
-    ema_agrees_buy = feats["_fast"] > feats["_slow"] and feats["_rsi"] > 50
-    ema_agrees_sell = feats["_fast"] < feats["_slow"] and feats["_rsi"] < 50
+class TradeDecision(NamedTuple):
+    """Resultado de decide_trade: campos por atributo o desempaquetando la tupla."""
+    signal: str  # "hold" | "buy" | "sell"
+    sl: float
+    tp: float
+    score: float
+    side_sign: float  # +1 buy, -1 sell, 0 hold
 
-    signal = "hold"
-    if score >= buy_th and ema_agrees_buy:
-        signal = "buy"
-    elif score <= sell_th and ema_agrees_sell:
-        signal = "sell"
 
-    sl, tp = 0.0, 0.0
-    if signal != "hold":
-        sl, tp = compute_sl_tp_atr(price=feats["_close"], atr_val=feats["_atr"], side=signal)
+@njit(cache=True)
+def _ema_last(x, period):
+    a = 2.0 / (period + 1.0)
+    y = x[0]
+    for i in range(1, x.shape[0]):
+        y = (1.0 - a) * y + a * x[i]
+    return y
+
+
+@njit(cache=True)
+def _decide_trade_core(close, high, low, volume, weights, bias):
+    """
+    Misma lógica que build_features() + scorer + reglas de decide_trade, en bucles sobre
+    arrays float64 contiguos. Devuelve (signal_id, score, sl, tp).
+    """
+    n = close.shape[0]
+
+    # EMA 9 / 21 (ewm adjust=False)
+    fast = _ema_last(close, 9)
+    slow = _ema_last(close, 21)
+
+    # RSI 14 (Wilder); un loss medio de 0 da NaN igual que en la versión pandas
+    a = 1.0 / 14.0
+    d = close[1] - close[0]
+    gain = d if d > 0.0 else 0.0
+    loss = -d if d < 0.0 else 0.0
+    for i in range(2, n):
+        d = close[i] - close[i - 1]
+        gain = (1.0 - a) * gain + a * (d if d > 0.0 else 0.0)
+        loss = (1.0 - a) * loss + a * (-d if d < 0.0 else 0.0)
+    rsi = np.nan if loss == 0.0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+    # ATR 14 (true range suavizado con ewm span)
+    a = 2.0 / 15.0
+    atr_v = high[0] - low[0]
+    for i in range(1, n):
+        tr = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        atr_v = (1.0 - a) * atr_v + a * tr
+
+    # VWAP 30: último valor válido (ffill) de la ventana móvil
+    vw = np.nan
+    for end in range(n - 1, -1, -1):
+        num = 0.0
+        den = 0.0
+        for j in range(max(0, end - 29), end + 1):
+            num += (high[j] + low[j] + close[j]) / 3.0 * volume[j]
+            den += volume[j]
+        if den != 0.0:
+            vw = num / den
+            break
+
+    last = close[n - 1]
+    mom = (fast - slow) / last
+    rsi_centered = (rsi - 50.0) / 50.0
+    vwap_dev = min(max((last - vw) / (atr_v + 1e-9), -3.0), 3.0)
+    atr_regime = min(max(atr_v / last / 0.01, 0.0), 5.0)
+
+    # pendiente de la regresión lineal de las últimas 5 velas (x = 0..4)
+    ym = 0.0
+    for j in range(n - 5, n):
+        ym += close[j]
+    ym /= 5.0
+    cov = 0.0
+    for k in range(5):
+        cov += (k - 2.0) * (close[n - 5 + k] - ym)
+    micro_trend = (cov / 10.0) / (ym + 1e-9)
+
+    z = bias + weights[0] * mom + weights[1] * rsi_centered + weights[2] * vwap_dev \
+        + weights[3] * atr_regime + weights[4] * micro_trend
+    score = np.tanh(z)
+
+    signal = SIGNAL_HOLD
+    if score >= 0.25 and fast > slow and rsi > 50.0:
+        signal = SIGNAL_BUY
+    elif score <= -0.25 and fast < slow and rsi < 50.0:
+        signal = SIGNAL_SELL
+
+    sl = 0.0
+    tp = 0.0
+    if signal != SIGNAL_HOLD:
+        sl_dist = min(max(0.35 * atr_v / last, 0.001), 0.012) * last
+        tp_dist = min(max(0.70 * atr_v / last, 0.002), 0.024) * last
+        if signal == SIGNAL_BUY:
+            sl, tp = last - sl_dist, last + tp_dist
+        else:
+            sl, tp = last + sl_dist, last - tp_dist
+    return signal, score, sl, tp
+
+
+def _scorer_weights() -> Tuple[np.ndarray, float]:
+    return np.array([float(scorer.weights.get(k, 0.0)) for k in FEATURE_NAMES], dtype=np.float64), float(scorer.bias)
+
+
+def _decision(signal: int, score: float, sl: float, tp: float) -> TradeDecision:
+    return TradeDecision(_SIGNALS[signal], float(sl), float(tp), float(score), float(SIDE_SIGNS[signal]))
+
+
+def decide_trade(ohlcv: pd.DataFrame) -> TradeDecision:
+    if ohlcv is None or ohlcv.shape[0] < MIN_BARS:
+        return _decision(SIGNAL_HOLD, 0.0, 0.0, 0.0)
+
+    weights, bias = _scorer_weights()
+    signal, score, sl, tp = _decide_trade_core(
+        ohlcv["close"].to_numpy(dtype=np.float64),
+        ohlcv["high"].to_numpy(dtype=np.float64),
+        ohlcv["low"].to_numpy(dtype=np.float64),
+        ohlcv["volume"].to_numpy(dtype=np.float64),
+        weights,
+        bias,
+    )
+    return _decision(signal, score, sl, tp)
+
+
+def decide_trade_array(ohlcv: np.ndarray) -> TradeDecision:
+    """decide_trade sobre el array crudo de ccxt (n, 6): ts, open, high, low, close, volume."""
+    if ohlcv is None or ohlcv.shape[0] < MIN_BARS:
+        return _decision(SIGNAL_HOLD, 0.0, 0.0, 0.0)
+
+    weights, bias = _scorer_weights()
+    signal, score, sl, tp = _decide_trade_core(ohlcv[:, 4], ohlcv[:, 2], ohlcv[:, 3], ohlcv[:, 5], weights, bias)
+    return _decision(signal, score, sl, tp)
+
+
+@njit(cache=True, parallel=True)
+def _decide_trade_batch_core(buf, counts, weights, bias):
+    n_sym, depth = buf.shape[0], buf.shape[1]
+    signals = np.zeros(n_sym, dtype=np.int8)
+    scores = np.zeros(n_sym, dtype=np.float64)
+    sls = np.zeros(n_sym, dtype=np.float64)
+    tps = np.zeros(n_sym, dtype=np.float64)
+    for i in prange(n_sym):
+        m = counts[i]
+        if m < MIN_BARS:
+            continue
+        s = depth - m
+        sig, score, sl, tp = _decide_trade_core(buf[i, s:, 3], buf[i, s:, 1], buf[i, s:, 2], buf[i, s:, 4], weights, bias)
+        signals[i] = sig
+        scores[i] = score
+        sls[i] = sl
+        tps[i] = tp
+    return signals, scores, sls, tps
+
+
+def _decide_trade_batch_numpy(buf, counts, weights, bias):
+    """
+    Camino sin numba de _decide_trade_batch_core: mismas fórmulas, pero cada paso de la
+    recurrencia (EMA/RSI/ATR) es una operación numpy sobre todos los símbolos a la vez,
+    en lugar de un bucle Python por símbolo y vela. VWAP y tendencia salen de sumas
+    acumuladas sobre el eje de velas.
+    """
+    n_sym, depth = buf.shape[0], buf.shape[1]
+    signals = np.zeros(n_sym, dtype=np.int8)
+    scores = np.zeros(n_sym, dtype=np.float64)
+    sls = np.zeros(n_sym, dtype=np.float64)
+    tps = np.zeros(n_sym, dtype=np.float64)
+    rows = np.flatnonzero(counts >= MIN_BARS)
+    if rows.size == 0:
+        return signals, scores, sls, tps
+
+    b = buf[rows]
+    high, low, close, volume = b[:, :, 1], b[:, :, 2], b[:, :, 3], b[:, :, 4]
+    start = depth - counts[rows].astype(np.int64)  # primera vela válida de cada fila
+    ar = np.arange(rows.size)
+
+    # el relleno previo a `start` puede ser basura: se enmascara, sin avisos de NaN/inf
+    with np.errstate(all="ignore"):
+        fast = close[ar, start].copy()
+        slow = fast.copy()
+        d = close[ar, start + 1] - close[ar, start]
+        gain = np.maximum(d, 0.0)
+        loss = np.maximum(-d, 0.0)
+        atr_v = high[ar, start] - low[ar, start]
+        a_fast, a_slow, a_rsi, a_atr = 2.0 / 10.0, 2.0 / 22.0, 1.0 / 14.0, 2.0 / 15.0
+        for t in range(int(start.min()) + 1, depth):
+            on = t > start
+            c = close[:, t]
+            prev = close[:, t - 1]
+            fast = np.where(on, (1.0 - a_fast) * fast + a_fast * c, fast)
+            slow = np.where(on, (1.0 - a_slow) * slow + a_slow * c, slow)
+            tr = np.maximum(np.maximum(high[:, t] - low[:, t], np.abs(high[:, t] - prev)), np.abs(low[:, t] - prev))
+            atr_v = np.where(on, (1.0 - a_atr) * atr_v + a_atr * tr, atr_v)
+            on_rsi = t > start + 1
+            d = c - prev
+            gain = np.where(on_rsi, (1.0 - a_rsi) * gain + a_rsi * np.maximum(d, 0.0), gain)
+            loss = np.where(on_rsi, (1.0 - a_rsi) * loss + a_rsi * np.maximum(-d, 0.0), loss)
+        rsi = np.where(loss == 0.0, np.nan, 100.0 - 100.0 / (1.0 + gain / loss))
+
+        # VWAP 30: ventana [end-29, end] por sumas acumuladas; último end con volumen (ffill)
+        valid = np.arange(depth)[None, :] >= start[:, None]
+        tp_vol = np.where(valid, (high + low + close) / 3.0 * volume, 0.0)
+        vol = np.where(valid, volume, 0.0)
+        zero = np.zeros((rows.size, 1))
+        cpv = np.concatenate([zero, np.cumsum(tp_vol, axis=1)], axis=1)
+        cvol = np.concatenate([zero, np.cumsum(vol, axis=1)], axis=1)
+        hi = np.arange(1, depth + 1)
+        lo = np.maximum(np.arange(depth) - 29, 0)
+        num = cpv[:, hi] - cpv[:, lo]
+        den = cvol[:, hi] - cvol[:, lo]
+        has_vol = (den != 0.0) & valid
+        end = depth - 1 - np.argmax(has_vol[:, ::-1], axis=1)
+        vw = np.where(has_vol.any(axis=1), num[ar, end] / den[ar, end], np.nan)
+
+        last = close[:, -1]
+        y = close[:, -5:]
+        ym = y.mean(axis=1)
+        micro_trend = ((np.arange(5.0) - 2.0) * (y - ym[:, None])).sum(axis=1) / 10.0 / (ym + 1e-9)
+
+        features = np.stack([
+            (fast - slow) / last,
+            (rsi - 50.0) / 50.0,
+            np.clip((last - vw) / (atr_v + 1e-9), -3.0, 3.0),
+            np.clip(atr_v / last / 0.01, 0.0, 5.0),
+            micro_trend,
+        ])
+        score = np.tanh(bias + weights @ features)
+
+        buy = (score >= 0.25) & (fast > slow) & (rsi > 50.0)
+        sell = ~buy & (score <= -0.25) & (fast < slow) & (rsi < 50.0)
+        sl_dist = np.clip(0.35 * atr_v / last, 0.001, 0.012) * last
+        tp_dist = np.clip(0.70 * atr_v / last, 0.002, 0.024) * last
+
+    signals[rows] = np.where(buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, SIGNAL_HOLD))
+    scores[rows] = score
+    sls[rows] = np.where(buy, last - sl_dist, np.where(sell, last + sl_dist, 0.0))
+    tps[rows] = np.where(buy, last + tp_dist, np.where(sell, last - tp_dist, 0.0))
+    return signals, scores, sls, tps
+
+
+def decide_trade_batch(buf: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    decide_trade para todo el universo en una pasada.
+
+    buf: (n_symbols, depth, 5) float64 con columnas open, high, low, close, volume; las
+    velas de cada símbolo alineadas al final (buf[i, -counts[i]:]).
+    Devuelve (signals int8 SIGNAL_*, scores, sls, tps); símbolos con < MIN_BARS velas quedan en hold.
+    Con numba corre el kernel compilado en paralelo; sin él, la versión vectorizada en numpy.
+    """
+    weights, bias = _scorer_weights()
+    if NUMBA_AVAILABLE:
+        return _decide_trade_batch_core(buf, counts, weights, bias)
+    return _decide_trade_batch_numpy(buf, counts, weights, bias)
+
+
+def warmup(depth: int = 200) -> None:
+    """
+    Fuerza la compilación (o la carga desde la caché en disco) de los kernels con las mismas
+    firmas que usan decide_trade_batch y decide_trade_array, para que el primer ciclo real
+    no pague el JIT. Sin numba no hace nada.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    close = 100.0 + np.sin(np.arange(depth, dtype=np.float64))
+    buf = np.empty((1, depth, 5), dtype=np.float64)
+    buf[0, :, 0] = close
+    buf[0, :, 1] = close + 1.0
+    buf[0, :, 2] = close - 1.0
+    buf[0, :, 3] = close
+    buf[0, :, 4] = 1.0
+    decide_trade_batch(buf, np.array([depth], dtype=np.int64))
+    raw = np.column_stack([np.arange(depth, dtype=np.float64), buf[0]])
+    decide_trade_array(raw)
 
-    return {"signal": signal, "sl": float(sl), "tp": float(tp), "score": float(score)}
 
 # Wrapper por compatibilidad
 def decide_signal(ohlcv: pd.DataFrame) -> str:
-    return decide_trade(ohlcv)["signal"]
\ No newline at end of file
+    return decide_trade(ohlcv).signal
\ No newline at end of file
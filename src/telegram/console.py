@@ -1,12 +1,45 @@
 import asyncio
+import json
+import logging
+import secrets
+from typing import Awaitable, Callable, Optional, Set
+
 import aiohttp
-from src.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from aiohttp import web
+from src.config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
+    TELEGRAM_WEBHOOK_URL, TELEGRAM_WEBHOOK_PORT, TELEGRAM_WEBHOOK_SECRET,
+)
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json for Telegram replies
+    orjson = None
+
+logger = logging.getLogger(__name__)
+_loads = orjson.loads if orjson is not None else json.loads
+
+CommandHandler = Callable[[str], Awaitable[None]]
+LONG_POLL_TIMEOUT = 50  # s que Telegram mantiene abierta cada getUpdates
+OUTBOX_MAXSIZE = 200  # mensajes pendientes antes de descartar los más viejos
+COALESCE_WINDOW = 0.25  # s durante los que se agrupan mensajes en un único envío
+MAX_MESSAGE_LEN = 4096
+SEND_TIMEOUT = 10  # s por sendMessage
+CLOSE_TIMEOUT = 15  # s que close() espera a que se vacíe la cola antes de cortar
+_STOP = object()  # centinela de close(): el sender envía lo pendiente y termina
 
 class TelegramConsole:
     def __init__(self, order_manager=None):
         self.order_manager = order_manager
         self.bot_token = TELEGRAM_BOT_TOKEN
         self.chat_id = TELEGRAM_CHAT_ID
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # sesión keep-alive reutilizada entre envíos: sin handshake TCP+TLS por mensaje
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=SEND_TIMEOUT))
+        return self._session
 
     async def send_message(self, message: str):
         if not self.bot_token or not self.chat_id:
@@ -14,10 +47,210 @@ class TelegramConsole:
             return
         url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
         payload = {"chat_id": self.chat_id, "text": message}
+        try:
+            async with self._get_session().post(url, json=payload) as resp:
+                if resp.status != 200:
+                    print("Failed to send Telegram message:", await resp.text())
+        except Exception as e:
+            print("Telegram send error:", e)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_console = TelegramConsole()
+# referencias a las tareas de comandos en curso (asyncio solo guarda referencias débiles)
+_command_tasks: Set[asyncio.Task] = set()
+_outbox: Optional[asyncio.Queue] = None
+_sender_task: Optional[asyncio.Task] = None
+
+
+async def _sender():
+    loop = asyncio.get_running_loop()
+    carry = None
+    stopping = False
+    while not stopping:
+        first = carry if carry is not None else await _outbox.get()
+        carry = None
+        if first is _STOP:
+            break
+        parts = [first]
+        # agrupar lo que llegue en la ventana en un solo sendMessage (límite de 4096 chars)
+        deadline = loop.time() + COALESCE_WINDOW
+        size = len(parts[0])
+        while True:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                nxt = await asyncio.wait_for(_outbox.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if nxt is _STOP:
+                stopping = True
+                break
+            if size + 1 + len(nxt) > MAX_MESSAGE_LEN:
+                carry = nxt
+                break
+            parts.append(nxt)
+            size += 1 + len(nxt)
+        message = "\n".join(parts)
+        try:
+            await _console.send_message(message)
+        except Exception as e:
+            logger.warning("Telegram send failed: %s", e)
+
+
+async def send_message(message: str):
+    """
+    Encola el mensaje y vuelve enseguida; una tarea dedicada hace el envío HTTP, así el
+    loop de trading nunca espera a Telegram. Si la cola está llena se descarta el más viejo.
+    """
+    global _outbox, _sender_task
+    if _outbox is None:
+        _outbox = asyncio.Queue(maxsize=OUTBOX_MAXSIZE)
+    if _sender_task is None or _sender_task.done():
+        _sender_task = asyncio.create_task(_sender())
+    if _outbox.full():
+        _outbox.get_nowait()
+        logger.warning("Telegram outbox full, dropping oldest message")
+    _outbox.put_nowait(message)
+
+
+async def close():
+    """Envía lo que quede en la cola (p. ej. el último PnL o el aviso de parada), para la
+    tarea de envío y cierra la sesión HTTP (al apagar el bot)."""
+    global _sender_task
+    if _sender_task is not None and not _sender_task.done():
+        if _outbox.full():
+            _outbox.get_nowait()
+            logger.warning("Telegram outbox full, dropping oldest message")
+        _outbox.put_nowait(_STOP)
+        try:
+            await asyncio.wait_for(_sender_task, CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Telegram outbox not drained within %ss, dropping the rest", CLOSE_TIMEOUT)
+        except asyncio.CancelledError:
+            pass
+    _sender_task = None
+    await _console.close()
+
+
+def _api_url(method: str) -> str:
+    return f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/{method}"
+
+
+def _command_from_update(update: dict) -> Optional[str]:
+    """'/status@MiBot extra' del chat configurado -> '/status'; cualquier otra cosa -> None."""
+    msg = update.get("message") or update.get("edited_message") or {}
+    if str((msg.get("chat") or {}).get("id")) != str(TELEGRAM_CHAT_ID):
+        return None
+    text = (msg.get("text") or "").strip()
+    if not text.startswith("/"):
+        return None
+    return text.split()[0].split("@")[0]
+
+
+def _dispatch(handler: CommandHandler, update: dict):
+    cmd = _command_from_update(update)
+    if cmd is None:
+        return
+    task = asyncio.create_task(handler(cmd))
+    _command_tasks.add(task)
+    task.add_done_callback(_on_command_done)
+
+
+def _on_command_done(task: asyncio.Task):
+    _command_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Telegram command handler failed: %s", task.exception())
+
+
+async def _serve_webhook(handler: CommandHandler):
+    """
+    Telegram empuja cada update a POST /telegram/<secret>; no hay ningún poll en el event loop.
+    El secreto va en la ruta y en la cabecera X-Telegram-Bot-Api-Secret-Token.
+    """
+    secret = TELEGRAM_WEBHOOK_SECRET or secrets.token_urlsafe(32)
+    path = f"/telegram/{secret}"
+
+    async def _on_update(request: web.Request) -> web.Response:
+        if request.headers.get("X-Telegram-Bot-Api-Secret-Token") != secret:
+            return web.Response(status=403)
+        try:
+            _dispatch(handler, await request.json(loads=_loads))
+        except Exception as e:
+            logger.warning("Bad Telegram update: %s", e)
+        # responder ya: el comando corre en su propia tarea
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(path, _on_update)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", TELEGRAM_WEBHOOK_PORT).start()
+    try:
         async with aiohttp.ClientSession() as session:
+            payload = {
+                "url": TELEGRAM_WEBHOOK_URL.rstrip("/") + path,
+                "secret_token": secret,
+                "allowed_updates": ["message", "edited_message"],
+                "drop_pending_updates": True,
+            }
+            async with session.post(_api_url("setWebhook"), json=payload) as resp:
+                data = await resp.json()
+                if not data.get("ok"):
+                    logger.error("setWebhook failed: %s", data)
+                else:
+                    logger.info("Telegram webhook registered on port %d", TELEGRAM_WEBHOOK_PORT)
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def _long_poll(handler: CommandHandler):
+    """Sin URL pública: getUpdates con long-poll sobre una única sesión HTTP persistente."""
+    offset = None
+    timeout = aiohttp.ClientTimeout(total=LONG_POLL_TIMEOUT + 10)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        # un webhook registrado antes bloquea getUpdates (409)
+        async with session.post(_api_url("deleteWebhook")) as resp:
+            await resp.read()
+        while True:
+            params = {"timeout": LONG_POLL_TIMEOUT, "allowed_updates": '["message","edited_message"]'}
+            if offset is not None:
+                params["offset"] = offset
             try:
-                async with session.post(url, json=payload) as resp:
-                    if resp.status != 200:
-                        print("Failed to send Telegram message:", await resp.text())
+                async with session.get(_api_url("getUpdates"), params=params) as resp:
+                    data = await resp.json(loads=_loads)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                print("Telegram send error:", e)
+                logger.warning("getUpdates failed: %s", e)
+                await asyncio.sleep(5)
+                continue
+            if not data.get("ok"):
+                # 429: Telegram indica cuánto esperar en parameters.retry_after
+                retry_after = (data.get("parameters") or {}).get("retry_after") or 5
+                logger.warning("getUpdates error %s, retrying in %ss", data.get("description"), retry_after)
+                await asyncio.sleep(float(retry_after))
+                continue
+            for update in data.get("result", ()):
+                offset = update["update_id"] + 1
+                _dispatch(handler, update)
+
+
+async def poll_commands(handler: CommandHandler):
+    """
+    Entrega cada comando del chat configurado a `handler`. Con TELEGRAM_WEBHOOK_URL usa
+    webhook (event-driven); si no, long-poll.
+    """
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        logger.info("Telegram not configured, command console disabled")
+        return
+    if TELEGRAM_WEBHOOK_URL:
+        await _serve_webhook(handler)
+    else:
+        await _long_poll(handler)
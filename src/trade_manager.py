@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from src.config import (
     MODE,
@@ -70,8 +71,9 @@ async def manage_position(exchange, symbol: str, signal: str, ohlcv_last_price:
 
     side = "buy" if signal == "buy" else "sell"
     if MODE == "paper":
-        # simulate execution at last price
-        save_order(
+        # simulate execution at last price (sqlite write in a worker thread, off the event loop)
+        await asyncio.to_thread(
+            save_order,
             symbol,
             side,
             float(ohlcv_last_price),
@@ -85,7 +87,7 @@ async def manage_position(exchange, symbol: str, signal: str, ohlcv_last_price:
         )
         logger.info("Simulated paper order placed: %s %s", side, symbol)
         # For demonstration, we won't update _daily_profit/_daily_loss until we settle trades (future)
-        save_balance(equity)  # snapshot
+        await asyncio.to_thread(save_balance, equity)  # snapshot
         return {
             "status": "paper_filled",
             "side": side,
@@ -99,7 +101,8 @@ async def manage_position(exchange, symbol: str, signal: str, ohlcv_last_price:
             order = await exchange.create_order(
                 symbol=symbol, type="market", side=side, amount=amount
             )
-            save_order(
+            await asyncio.to_thread(
+                save_order,
                 symbol,
                 side,
                 order.get("price") or ohlcv_last_price,
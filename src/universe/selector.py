@@ -35,27 +35,30 @@ class UniverseSelector:
 
     def get_active_symbols(self, exchange_client) -> List[str]:
         """Get active symbols based on plan configuration."""
-        plan = self.plan_loader.get_plan()
+        universe = self.plan_loader.get_plan().universe
         
-        if plan.universe.mode == "static":
+        if universe.mode == "static":
             # Return static symbols excluding any excluded ones
-            symbols = [s for s in plan.universe.static_symbols if s not in plan.universe.exclude_symbols]
-            log.debug(f"Using static universe: {symbols}")
+            exclude = set(universe.exclude_symbols)
+            symbols = [s for s in universe.static_symbols if s not in exclude]
+            log.debug("Using static universe: %s", symbols)
             return symbols
         
-        elif plan.universe.mode == "dynamic":
+        elif universe.mode == "dynamic":
             return self._get_dynamic_symbols(exchange_client)
         
         else:
             # Fallback to static symbols
-            symbols = [s for s in plan.universe.static_symbols if s not in plan.universe.exclude_symbols]
-            log.warning(f"Unknown universe mode '{plan.universe.mode}', using static fallback: {symbols}")
+            exclude = set(universe.exclude_symbols)
+            symbols = [s for s in universe.static_symbols if s not in exclude]
+            log.warning("Unknown universe mode '%s', using static fallback: %s", universe.mode, symbols)
             return symbols
 
     def _get_dynamic_symbols(self, exchange_client) -> List[str]:
         """Get dynamically selected symbols based on liquidity metrics."""
-        plan = self.plan_loader.get_plan()
-        selector_config = plan.universe.dynamic_selector
+        universe = self.plan_loader.get_plan().universe
+        selector_config = universe.dynamic_selector
+        exclude = set(universe.exclude_symbols)
         
         # Check if refresh is needed
         now = time.time()
@@ -64,7 +67,7 @@ class UniverseSelector:
         if (self._cached_symbols is not None and 
             self._last_refresh is not None and 
             now - self._last_refresh < refresh_interval_sec):
-            log.debug(f"Using cached dynamic universe: {self._cached_symbols}")
+            log.debug("Using cached dynamic universe: %s", self._cached_symbols)
             return self._cached_symbols
         
         try:
@@ -74,7 +77,7 @@ class UniverseSelector:
             available_symbols = self._get_available_symbols(exchange_client)
             
             # Filter out excluded symbols
-            available_symbols = [s for s in available_symbols if s not in plan.universe.exclude_symbols]
+            available_symbols = [s for s in available_symbols if s not in exclude]
             
             # Compute metrics for each symbol
             symbol_metrics = self._compute_symbol_metrics(available_symbols, exchange_client)
@@ -90,14 +93,14 @@ class UniverseSelector:
             self._last_refresh = now
             self._symbol_metrics = {s.symbol: s for s in symbol_metrics if s.symbol in selected_symbols}
             
-            log.info(f"Selected {len(selected_symbols)} symbols for dynamic universe: {selected_symbols}")
+            log.info("Selected %d symbols for dynamic universe: %s", len(selected_symbols), selected_symbols)
             return selected_symbols
             
         except Exception as e:
-            log.error(f"Error in dynamic symbol selection: {e}")
+            log.error("Error in dynamic symbol selection: %s", e)
             # Fallback to static symbols
-            fallback_symbols = [s for s in plan.universe.static_symbols if s not in plan.universe.exclude_symbols]
-            log.warning(f"Falling back to static universe: {fallback_symbols}")
+            fallback_symbols = [s for s in universe.static_symbols if s not in exclude]
+            log.warning("Falling back to static universe: %s", fallback_symbols)
             return fallback_symbols
 
     def _get_available_symbols(self, exchange_client) -> List[str]:
@@ -105,10 +108,10 @@ class UniverseSelector:
         try:
             # Use existing method from exchange client
             symbols = exchange_client.get_usdt_perp_symbols(min_volume=0, max_symbols=1000)
-            log.debug(f"Found {len(symbols)} available USDT perpetual symbols")
+            log.debug("Found %d available USDT perpetual symbols", len(symbols))
             return symbols
         except Exception as e:
-            log.error(f"Error fetching available symbols: {e}")
+            log.error("Error fetching available symbols: %s", e)
             # Fallback to common symbols
             return ["BTC/USDT", "ETH/USDT", "BNB/USDT", "SOL/USDT", "XRP/USDT", "DOGE/USDT", "ADA/USDT", "AVAX/USDT"]
 
@@ -130,7 +133,7 @@ class UniverseSelector:
                 quote_volume_24h = float(ticker.get('quoteVolume', 0))
                 
                 if last_price <= 0 or bid <= 0 or ask <= 0:
-                    log.debug(f"Invalid price data for {symbol}, skipping")
+                    log.debug("Invalid price data for %s, skipping", symbol)
                     continue
                 
                 # Compute spread in basis points
@@ -154,10 +157,10 @@ class UniverseSelector:
                 ))
                 
             except Exception as e:
-                log.debug(f"Error computing metrics for {symbol}: {e}")
+                log.debug("Error computing metrics for %s: %s", symbol, e)
                 continue
         
-        log.debug(f"Computed metrics for {len(metrics)} symbols")
+        log.debug("Computed metrics for %d symbols", len(metrics))
         return metrics
 
     def _get_ticker_safe(self, symbol: str, exchange_client) -> Optional[Dict]:
@@ -168,10 +171,10 @@ class UniverseSelector:
                 ticker = exchange_client.exchange.fetch_ticker(symbol)
                 return ticker
             else:
-                log.debug(f"Exchange client doesn't have expected interface for {symbol}")
+                log.debug("Exchange client doesn't have expected interface for %s", symbol)
                 return None
         except Exception as e:
-            log.debug(f"Error fetching ticker for {symbol}: {e}")
+            log.debug("Error fetching ticker for %s: %s", symbol, e)
             return None
 
     def _compute_realized_volatility(self, symbol: str, exchange_client) -> float:
@@ -179,7 +182,7 @@ class UniverseSelector:
         try:
             # Fetch recent OHLCV data
             df = exchange_client.fetch_ohlcv_df(symbol, timeframe="1m", limit=30)
-            if df.empty or len(df) < 10:
+            if df is None or df.shape[0] < 10:
                 return 0.0
             
             # Compute returns
@@ -194,7 +197,7 @@ class UniverseSelector:
             return max(0.0, rvol_bps)
             
         except Exception as e:
-            log.debug(f"Error computing realized volatility for {symbol}: {e}")
+            log.debug("Error computing realized volatility for %s: %s", symbol, e)
             return 0.0
 
     def _compute_depth_within_5bps(self, symbol: str, price: float, exchange_client) -> float:
@@ -212,7 +215,7 @@ class UniverseSelector:
                 return 50000.0   # Assume moderate depth for others
                 
         except Exception as e:
-            log.debug(f"Error computing depth for {symbol}: {e}")
+            log.debug("Error computing depth for %s: %s", symbol, e)
             return 0.0
 
     def _apply_filters(self, metrics: List[SymbolMetrics], config) -> List[str]:
@@ -222,22 +225,22 @@ class UniverseSelector:
         for metric in metrics:
             # Filter by minimum 24h quote volume
             if metric.quote_volume_24h_usdt < config.min_quote_volume_24h_usdt:
-                log.debug(f"{metric.symbol}: volume {metric.quote_volume_24h_usdt:.0f} < {config.min_quote_volume_24h_usdt:.0f}")
+                log.debug("%s: volume %.0f < %.0f", metric.symbol, metric.quote_volume_24h_usdt, config.min_quote_volume_24h_usdt)
                 continue
             
             # Filter by maximum spread
             if metric.spread_bps > config.max_spread_bps:
-                log.debug(f"{metric.symbol}: spread {metric.spread_bps:.2f}bps > {config.max_spread_bps:.2f}bps")
+                log.debug("%s: spread %.2fbps > %.2fbps", metric.symbol, metric.spread_bps, config.max_spread_bps)
                 continue
             
             # Filter by minimum depth (if available)
             if metric.depth_usdt_within_5bps < config.min_depth_usdt_within_5bps:
-                log.debug(f"{metric.symbol}: depth {metric.depth_usdt_within_5bps:.0f} < {config.min_depth_usdt_within_5bps:.0f}")
+                log.debug("%s: depth %.0f < %.0f", metric.symbol, metric.depth_usdt_within_5bps, config.min_depth_usdt_within_5bps)
                 continue
             
             # Filter by minimum realized volatility
             if metric.rvol_1m_bps < config.min_rvol_1m_bps:
-                log.debug(f"{metric.symbol}: rvol {metric.rvol_1m_bps:.2f}bps < {config.min_rvol_1m_bps:.2f}bps")
+                log.debug("%s: rvol %.2fbps < %.2fbps", metric.symbol, metric.rvol_1m_bps, config.min_rvol_1m_bps)
                 continue
             
             filtered.append(metric.symbol)
@@ -246,7 +249,7 @@ class UniverseSelector:
         volume_map = {m.symbol: m.quote_volume_24h_usdt for m in metrics}
         filtered.sort(key=lambda s: volume_map.get(s, 0), reverse=True)
         
-        log.debug(f"Applied filters: {len(filtered)} symbols passed from {len(metrics)} candidates")
+        log.debug("Applied filters: %d symbols passed from %d candidates", len(filtered), len(metrics))
         return filtered
 
     def get_symbol_metrics(self, symbol: str) -> Optional[SymbolMetrics]:
@@ -0,0 +1 @@
+"""Utilidades internas del paquete src."""
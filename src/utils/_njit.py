@@ -0,0 +1,23 @@
+"""
+numba es opcional: sin él, `njit` deja la función como Python puro (mismo resultado,
+más lento) y `prange` es `range`, así los kernels se importan igual en cualquier entorno.
+"""
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # soporta tanto @njit como @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+__all__ = ["njit", "prange", "NUMBA_AVAILABLE"]
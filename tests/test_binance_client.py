@@ -0,0 +1,57 @@
+import asyncio
+
+import ccxt.async_support as ccxt
+
+from src.exchange.binance_client import BinanceClient
+
+# respuestas reales de /fapi/v1/order y /fapi/v2/balance (recortadas)
+ORDER_BODY = (
+    '{"orderId":8389765519876543210,"symbol":"BTCUSDT","status":"FILLED","clientOrderId":"x-abc",'
+    '"price":"0.10000000","avgPrice":"64123.45000000","origQty":"0.003","executedQty":"0.003",'
+    '"cumQuote":"192.37035","timeInForce":"GTC","type":"LIMIT","reduceOnly":false,'
+    '"closePosition":false,"side":"BUY","positionSide":"LONG","stopPrice":"0","workingType":"CONTRACT_PRICE",'
+    '"priceProtect":false,"origType":"LIMIT","time":1760000000000,"updateTime":1760000000123}'
+)
+BALANCE_BODY = (
+    '[{"accountAlias":"SgsR","asset":"USDT","balance":"122607.35137903","crossWalletBalance":"23.72469206",'
+    '"crossUnPnl":"0.00000000","availableBalance":"23.72469206","maxWithdrawAmount":"23.72469206",'
+    '"marginAvailable":true,"updateTime":1617939110373}]'
+)
+
+
+async def _client_exchange(monkeypatch):
+    async def no_markets(self, *args, **kwargs):
+        return {}
+
+    monkeypatch.setattr(ccxt.binance, "load_markets", no_markets)
+    client = BinanceClient(api_key="k", api_secret="s")
+    await client._ensure_exchange()
+    return client
+
+
+def test_client_decodes_responses_like_ccxt(monkeypatch):
+    async def run():
+        client = await _client_exchange(monkeypatch)
+        reference = ccxt.binance({"options": {"defaultType": "future"}})
+        try:
+            ex = client.exchange
+            for body in (ORDER_BODY, BALANCE_BODY):
+                assert repr(ex.parse_json(body)) == repr(reference.parse_json(body))
+            assert ex.parse_order(ex.parse_json(ORDER_BODY)) == reference.parse_order(reference.parse_json(ORDER_BODY))
+            assert ex.parse_json("<html>502 Bad Gateway</html>") is None
+        finally:
+            await client.close()
+            await reference.close()
+
+    asyncio.run(run())
+
+
+def test_client_does_not_override_parse_json(monkeypatch):
+    async def run():
+        client = await _client_exchange(monkeypatch)
+        try:
+            assert "parse_json" not in vars(client.exchange)
+        finally:
+            await client.close()
+
+    asyncio.run(run())
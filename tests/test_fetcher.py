@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src import fetcher
+
+diskcache = pytest.importorskip("diskcache")
+
+DAY_MS = 86_400_000
+JAN_2024 = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class FakeExchange:
+    """fetch_ohlcv de BinanceClient: velas diarias desde `since`, o None (error transitorio)."""
+
+    def __init__(self, available_until=None, fail=False):
+        self.available_until = available_until  # última vela que "existe" (ms), None = todas
+        self.fail = fail
+        self.calls = 0
+
+    async def fetch_ohlcv(self, symbol, timeframe="1d", since=None, limit=100):
+        self.calls += 1
+        if self.fail:
+            return None
+        rows = []
+        for i in range(limit):
+            ts = since + i * DAY_MS
+            if self.available_until is not None and ts > self.available_until:
+                break
+            px = 100.0 + ts / DAY_MS % 7
+            rows.append([ts, px, px + 1, px - 1, px, 10.0])
+        return rows or None
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = diskcache.Cache(str(tmp_path / "ohlcv"))
+    monkeypatch.setattr(fetcher, "_cache", c)
+    yield c
+    c.close()
+
+
+def _fetch_january(exchange):
+    return asyncio.run(fetcher.fetch_ohlcv_array(exchange, "BTC/USDT", "1d", limit=31, since=JAN_2024))
+
+
+def test_complete_closed_month_is_served_from_cache(cache):
+    first = FakeExchange()
+    bars = _fetch_january(first)
+    assert bars.shape == (31, 6)
+    assert first.calls == 1
+    assert ("BTC/USDT", "1d", "2024-01") in cache
+
+    second = FakeExchange()
+    again = _fetch_january(second)
+    assert second.calls == 0
+    np.testing.assert_array_equal(again, bars)
+
+
+def test_partial_fetch_is_not_cached(cache):
+    partial = FakeExchange(available_until=JAN_2024 + 14 * DAY_MS)
+    bars = _fetch_january(partial)
+    assert bars.shape == (15, 6)
+    assert len(cache) == 0
+
+    complete = FakeExchange()
+    bars = _fetch_january(complete)
+    assert complete.calls == 1  # se vuelve a pedir: la primera respuesta no cubría el mes
+    assert bars.shape == (31, 6)
+
+
+def test_failed_fetch_is_not_cached(cache):
+    assert _fetch_january(FakeExchange(fail=True)).shape == (0, 6)
+    assert len(cache) == 0
+
@@ -0,0 +1,117 @@
+import asyncio
+import types
+
+import pytest
+from ccxt.base.errors import DDoSProtection, ExchangeError, RateLimitExceeded
+
+from src.exchange import rate_limit
+from src.exchange.rate_limit import BinanceRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Reloj manual: sleep() avanza el tiempo en lugar de esperar."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(monotonic=c.monotonic))
+    monkeypatch.setattr(rate_limit, "asyncio", types.SimpleNamespace(sleep=c.sleep, Lock=asyncio.Lock))
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: 0.0)  # sin jitter
+    return c
+
+
+class FakeClient:
+    def __init__(self, headers=None):
+        self.last_response_headers = headers or {}
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4)
+
+    async def run():
+        await bucket.acquire(4)  # ráfaga completa: sin espera
+        assert clock.sleeps == []
+        await bucket.acquire(3)  # faltan 3 tokens a 2/s
+
+    asyncio.run(run())
+    assert sum(clock.sleeps) == pytest.approx(1.5)
+
+
+def test_observe_lowers_available_weight_to_server_count(clock):
+    limiter = BinanceRateLimiter({"market": (64.0, 2400), "order": (32.0, 300)})
+    limiter.observe({"X-MBX-USED-WEIGHT-1M": "2300", "X-MBX-ORDER-COUNT-10S": "299"})
+
+    async def run():
+        await limiter.acquire("market", 100)  # quedan 100: pasa sin esperar
+        assert clock.sleeps == []
+        await limiter.acquire("market", 64)  # bucket vacío: 1s a 64/s
+        assert clock.sleeps == [1.0]
+        await limiter.acquire("order", 1)  # quedaba 1 orden; su peso también espera
+        assert clock.sleeps == [1.0, 1 / 64]
+        await limiter.acquire("order", 1)  # la orden gastada en t=1 se recarga a 32/s
+
+    asyncio.run(run())
+    assert clock.now == 1.0 + 1 / 32
+
+
+def test_observe_never_raises_available_tokens(clock):
+    limiter = BinanceRateLimiter({"market": (64.0, 2400), "order": (32.0, 300)})
+
+    async def run():
+        await limiter.acquire("market", 2000)
+        limiter.observe({"x-mbx-used-weight-1m": "10"})  # el servidor ve menos: no se regalan tokens
+        await limiter.acquire("market", 800)
+
+    asyncio.run(run())
+    assert clock.sleeps == [400 / 64]
+
+
+@pytest.mark.parametrize("exc", [RateLimitExceeded("binance 429 Too Many Requests"), DDoSProtection("binance 418 banned")])
+def test_call_retries_after_server_retry_after(clock, exc):
+    client = FakeClient({"Retry-After": "7"})
+    calls = []
+
+    async def fn(x):
+        calls.append(x)
+        if len(calls) == 1:
+            raise exc
+        return x * 2
+
+    result = asyncio.run(BinanceRateLimiter().call(client, "market", 1, fn, 21))
+    assert result == 42
+    assert calls == [21, 21]
+    assert clock.sleeps == [7.0]
+
+
+def test_call_backs_off_exponentially_without_retry_after(clock):
+    async def fn():
+        raise RateLimitExceeded("binance 429")
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(BinanceRateLimiter().call(FakeClient(), "market", 1, fn, retries=2))
+    assert clock.sleeps == [1.0, 2.0]
+
+
+def test_call_does_not_retry_other_errors(clock):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        raise ExchangeError("binance -2019 Margin is insufficient")
+
+    with pytest.raises(ExchangeError):
+        asyncio.run(BinanceRateLimiter().call(FakeClient(), "order", 1, fn))
+    assert calls == [1]
+    assert clock.sleeps == []
@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ai.scorer import scorer
+from src.strategy import strategy
+from src.strategy.strategy import (
+    MIN_BARS, SIGNAL_BUY, SIGNAL_HOLD, SIGNAL_SELL, build_features, compute_sl_tp_atr, decide_trade,
+)
+from src.utils._njit import NUMBA_AVAILABLE
+
+_SIGNAL_IDS = {"hold": SIGNAL_HOLD, "buy": SIGNAL_BUY, "sell": SIGNAL_SELL}
+
+
+def _reference(df: pd.DataFrame):
+    """decide_trade tal y como era antes del kernel: build_features + scorer.score + reglas."""
+    feats = build_features(df)
+    score = scorer.score(feats)
+    signal = "hold"
+    if score >= 0.25 and feats["_fast"] > feats["_slow"] and feats["_rsi"] > 50:
+        signal = "buy"
+    elif score <= -0.25 and feats["_fast"] < feats["_slow"] and feats["_rsi"] < 50:
+        signal = "sell"
+    sl, tp = 0.0, 0.0
+    if signal != "hold":
+        sl, tp = compute_sl_tp_atr(price=feats["_close"], atr_val=feats["_atr"], side=signal)
+    return signal, score, float(sl), float(tp)
+
+
+def _ohlcv(rng, n, drift=0.0, zero_volume=False):
+    close = 100.0 * np.exp(np.cumsum(rng.normal(drift, 0.004, n)))
+    spread = close * rng.uniform(0.0005, 0.004, n)
+    volume = rng.uniform(1.0, 50.0, n)
+    if zero_volume:
+        volume[rng.random(n) < 0.3] = 0.0
+        volume[-35:] = 0.0  # ventana VWAP final sin volumen: vale el último valor válido
+    return pd.DataFrame({
+        "timestamp": np.arange(n, dtype=np.float64) * 60_000,
+        "open": close + rng.normal(0, 0.1, n),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": volume,
+    })
+
+
+def _cases():
+    rng = np.random.default_rng(7)
+    cases = []
+    for i in range(60):
+        drift = (-0.002, 0.0, 0.002)[i % 3]
+        cases.append(_ohlcv(rng, int(rng.integers(MIN_BARS, 300)), drift=drift, zero_volume=i % 5 == 0))
+    return cases
+
+
+def _monotonic_up(n=60):
+    # ninguna vela baja: loss medio 0 -> RSI NaN en ambas versiones -> hold
+    close = 100.0 + np.arange(n, dtype=np.float64)
+    return pd.DataFrame({
+        "timestamp": np.arange(n, dtype=np.float64) * 60_000,
+        "open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": np.ones(n),
+    })
+
+
+def _assert_same(got, want):
+    signal, score, sl, tp = want
+    assert got[0] == signal
+    if math.isnan(score):
+        assert math.isnan(got[1])
+    else:
+        assert got[1] == pytest.approx(score, rel=1e-9, abs=1e-12)
+    assert got[2] == pytest.approx(sl, rel=1e-9)
+    assert got[3] == pytest.approx(tp, rel=1e-9)
+
+
+@pytest.fixture(params=["numba", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numba":
+        if not NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+    elif NUMBA_AVAILABLE:
+        # mismos kernels sin compilar: el camino de un entorno sin numba
+        monkeypatch.setattr(strategy, "_decide_trade_core", strategy._decide_trade_core.py_func)
+        monkeypatch.setattr(strategy, "_ema_last", strategy._ema_last.py_func)
+    return request.param
+
+
+def test_decide_trade_matches_pandas_features_and_scorer(backend):
+    cases = _cases()
+    seen = set()
+    for df in cases:
+        want = _reference(df)
+        d = decide_trade(df)
+        _assert_same((d.signal, d.score, d.sl, d.tp), want)
+        seen.add(want[0])
+    assert seen == {"hold", "buy", "sell"}  # el muestreo cubre las tres ramas
+
+
+def test_zero_loss_rsi_is_nan_and_holds(backend):
+    df = _monotonic_up()
+    want = _reference(df)
+    assert math.isnan(build_features(df)["_rsi"])
+    assert want[0] == "hold" and math.isnan(want[1])
+    d = decide_trade(df)
+    _assert_same((d.signal, d.score, d.sl, d.tp), want)
+
+
+def test_decide_trade_short_history_holds():
+    d = decide_trade(_monotonic_up(MIN_BARS - 1))
+    assert (d.signal, d.score, d.sl, d.tp) == ("hold", 0.0, 0.0, 0.0)
+
+
+@pytest.mark.parametrize("kernel", ["_decide_trade_batch_core", "_decide_trade_batch_numpy"])
+def test_decide_trade_batch_matches_reference(kernel):
+    if kernel == "_decide_trade_batch_core" and not NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+    cases = _cases() + [_monotonic_up(), _monotonic_up(MIN_BARS - 1)]
+    depth = max(len(df) for df in cases)
+    buf = np.full((len(cases), depth, 5), np.nan)  # relleno previo a cada serie: basura
+    counts = np.array([len(df) for df in cases], dtype=np.int64)
+    for i, df in enumerate(cases):
+        buf[i, depth - len(df):] = df[["open", "high", "low", "close", "volume"]].to_numpy()
+    weights, bias = strategy._scorer_weights()
+
+    signals, scores, sls, tps = getattr(strategy, kernel)(buf, counts, weights, bias)
+
+    for i, df in enumerate(cases):
+        if len(df) < MIN_BARS:
+            assert signals[i] == SIGNAL_HOLD and scores[i] == 0.0
+            continue
+        signal, score, sl, tp = _reference(df)
+        _assert_same((signals[i], scores[i], sls[i], tps[i]), (_SIGNAL_IDS[signal], score, sl, tp))
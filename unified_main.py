@@ -14,12 +14,13 @@ Incluye:
 
 import asyncio
 import logging
-import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Any, Dict
 from os import getenv
 import os
 import math
+import time
 
 # Load .env early so getenv reads values from .env (optional: wrapped in try/except)
 try:
@@ -36,14 +37,15 @@ setup_logging(logfile="logs/unified_main.log.txt", level=logging.INFO)
 
 from src.config import (
     API_KEY, API_SECRET, USE_TESTNET, DRY_RUN, DAILY_PROFIT_TARGET,
-    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, HEDGE_MODE
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, HEDGE_MODE, FAST_RATE_LIMIT
 )
 from src.exchange.binance_client import BinanceClient
-from src.notifier.telegram_notifier import TelegramNotifier
+from src.exchange.market_data import MarketDataCache
+from src.fetcher import timeframe_ms
+from src.notifier.telegram_notifier import TelegramNotifier, close_session as close_telegram_session
 from src.state_manager import StateManager
+from src.strategy.signals import trend_signal
 from src.trading.scalping_order_manager import ScalpingOrderManager
-from ta.trend import EMAIndicator
-from ta.momentum import RSIIndicator
 
 # Obtener logger para este módulo (root logger ya configurado por setup_logging)
 logger = logging.getLogger(__name__)
@@ -72,21 +74,61 @@ TIMEFRAME_SIGNAL = "1m"
 TIMEFRAME_TENDENCIA = "15m"
 REFRESH_SYMBOLS_MINUTES = int(getenv("REFRESH_SYMBOLS_MINUTES", "15"))
 TELEGRAM_MSG_MAX = 4000
+# pares analizados a la vez; el BinanceClient ya limita el peso REST por minuto
+SYMBOL_CONCURRENCY = int(getenv("SYMBOL_CONCURRENCY", "12"))
+ORDER_CONCURRENCY = 4  # colocaciones de entrada (entry + SL/TP) simultáneas
+# velas 1m/15m por WebSocket (un stream combinado por timeframe); REST solo para sembrar
+KLINE_STREAM = getenv("KLINE_STREAM", "True").lower() in ("1", "true", "yes")
+STREAM_BARS = 50  # velas por símbolo en memoria: lo que usa analizar_signal
+
+
+def _order_fill_info(order: Dict[str, Any]):
+    """(filled, avg) de una orden ccxt, con fallback a los campos raw de Binance."""
+    info = order.get("info") or {}
+    filled = float(order.get("filled") or info.get("executedQty") or 0.0)
+    avg = order.get("average") or info.get("avgPrice")
+    try:
+        avg = float(avg) if avg is not None else None
+    except Exception:
+        avg = None
+    return filled, avg
+
 
 class CryptoBot:
     def __init__(self):
         self.exchange = BinanceClient(
             api_key=API_KEY, api_secret=API_SECRET,
-            use_testnet=USE_TESTNET, dry_run=DRY_RUN, hedge_mode=HEDGE_MODE
+            use_testnet=USE_TESTNET, dry_run=DRY_RUN, hedge_mode=HEDGE_MODE,
+            fast_rate_limit=FAST_RATE_LIMIT,
         )
         self.telegram = TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, rate_limit_per_min=TELEGRAM_RATE_PER_MIN)
+        self.telegram_enabled = bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
         self.state = StateManager(daily_profit_target=DAILY_PROFIT_TARGET)
         self.scalper = ScalpingOrderManager(self.exchange, self.state, notifier=self.telegram, tp_timeout=TP_TIMEOUT_SEC, entry_fill_timeout=ENTRY_FILL_TIMEOUT_SEC, hedge_mode=HEDGE_MODE)
         self._stop_event = asyncio.Event()
         self.last_loop_heartbeat = datetime.now(timezone.utc)
         self.symbols: List[str] = []
+        # (symbol, timeframe) -> últimas velas ccxt; cada ciclo solo se piden las nuevas
+        self._klines: Dict[tuple, List[list]] = {}
+        # timeframe -> caché alimentada por WebSocket (si KLINE_STREAM) y su tarea de lectura
+        self._streams: Dict[str, MarketDataCache] = {}
+        self._stream_tasks: List[asyncio.Task] = []
+        # (symbol, timeframe) -> epoch del stream en que se sembró desde REST
+        self._seeded_epoch: Dict[tuple, int] = {}
+        # symbol -> ((ts, close, nº velas) de las series 1m y 15m, señal): las velas anteriores
+        # ya están cerradas, así que si la última no ha cambiado la señal tampoco
+        self._signal_memo: Dict[str, tuple] = {}
+        # un lock por símbolo: el análisis/entrada de un par no se solapa consigo mismo
+        # (ciclos o monitor), pero sí con los demás pares
+        self._symbol_locks: Dict[str, asyncio.Lock] = {}
+        self._order_sem = asyncio.Semaphore(ORDER_CONCURRENCY)
+        self._pending_entries = 0  # entradas colocándose ahora mismo (aún no en open_positions)
+        # avisos no críticos del ciclo en curso; se envían juntos al terminar (None = fuera de ciclo)
+        self._cycle_msgs: Optional[List[str]] = None
 
     async def safe_send_telegram(self, msg: str):
+        if not self.telegram_enabled:
+            return
         try:
             if len(msg) <= TELEGRAM_MSG_MAX:
                 await self.telegram.send_message(msg)
@@ -96,15 +138,37 @@ class CryptoBot:
         except Exception as e:
             logger.warning("Telegram message enqueue failed: %s", e)
 
+    async def _report(self, msg: str):
+        """Aviso informativo: dentro de un ciclo se acumula para un único mensaje al final."""
+        if self._cycle_msgs is None:
+            await self.safe_send_telegram(msg)
+        else:
+            self._cycle_msgs.append(msg)
+
     async def refresh_symbols(self):
         try:
-            syms = await self.exchange.fetch_all_symbols()
-            filtered_syms = []
-            # Note: this is still one API call per symbol for 24h change; can be optimized later
-            for sym in syms:
-                change_pct = await self.exchange.fetch_24h_change(sym)
-                if change_pct is not None and change_pct >= PCT_CHANGE_24H:
-                    filtered_syms.append(sym)
+            syms, changes = await asyncio.gather(
+                self.exchange.fetch_all_symbols(), self.exchange.fetch_all_24h_changes()
+            )
+            if changes:
+                # una sola llamada para todo el mercado; el filtro es un único paso vectorizado
+                market_id = self.exchange.market_id
+                pct = np.array([changes.get(market_id(s), np.nan) for s in syms], dtype=np.float64)
+                filtered_syms = [syms[i] for i in np.flatnonzero(pct >= PCT_CHANGE_24H)]
+            else:
+                filtered_syms = []
+                for sym in syms:
+                    change_pct = await self.exchange.fetch_24h_change(sym)
+                    if change_pct is not None and change_pct >= PCT_CHANGE_24H:
+                        filtered_syms.append(sym)
+            if KLINE_STREAM and set(filtered_syms) != set(self.symbols):
+                self._restart_streams(filtered_syms)
+            # los pares que salen del universo no se vuelven a leer: fuera sus velas y su señal
+            keep = set(filtered_syms)
+            for key in [k for k in self._klines if k[0] not in keep]:
+                del self._klines[key]
+            for sym in [s for s in self._signal_memo if s not in keep]:
+                del self._signal_memo[sym]
             self.symbols = filtered_syms
             logger.info("Símbolos filtrados por ±%s%%: %s", PCT_CHANGE_24H, filtered_syms)
             await self.safe_send_telegram(f"🔄 Lista de símbolos refrescada ({len(filtered_syms)}): {filtered_syms}")
@@ -112,33 +176,103 @@ class CryptoBot:
             logger.exception("Error refrescando símbolos: %s", e)
             await self.safe_send_telegram(f"❌ Error refrescando símbolos: {e}")
 
+    def _restart_streams(self, symbols: List[str]):
+        """Un stream de klines por timeframe para el universo actual (se rehace al cambiar)."""
+        self.stop_streams()
+        if not symbols:
+            return
+        for tf in (TIMEFRAME_SIGNAL, TIMEFRAME_TENDENCIA):
+            cache = MarketDataCache(symbols, tf, maxlen=STREAM_BARS, testnet=USE_TESTNET)
+            self._streams[tf] = cache
+            self._stream_tasks.append(asyncio.create_task(cache.run()))
+
+    def stop_streams(self):
+        for cache in self._streams.values():
+            cache.stop()
+        for task in self._stream_tasks:
+            task.cancel()
+        self._streams = {}
+        self._stream_tasks = []
+        self._seeded_epoch = {}
+
+    async def _fetch_klines(self, sym: str, timeframe: str, limit: int) -> Optional[List[list]]:
+        """
+        Últimas `limit` velas de sym. Con stream activo y el buffer del símbolo lleno se leen
+        de memoria, sin red. Si no, REST: la primera vez se piden todas (y siembran el
+        buffer del stream); después solo desde la última vela guardada (que puede seguir
+        abierta y se reemplaza) hasta ahora.
+        """
+        key = (sym, timeframe)
+        stream = self._streams.get(timeframe)
+        # buffer válido: conectado, sembrado en esta conexión (sin huecos) y con velas suficientes
+        if (
+            stream is not None
+            and stream.connected
+            and self._seeded_epoch.get(key) == stream.epoch
+            and stream.count(sym) >= limit
+        ):
+            self._klines[key] = rows = stream.last_rows(sym, limit).tolist()
+            return rows
+        rows = await self._fetch_klines_rest(sym, timeframe, limit)
+        # el stream puede haberse rehecho (refresh de símbolos) mientras esperábamos a REST
+        if rows and stream is not None and stream.connected and self._streams.get(timeframe) is stream:
+            stream.seed_array(sym, np.asarray(rows, dtype=np.float64))
+            self._seeded_epoch[key] = stream.epoch
+        return rows
+
+    async def _fetch_klines_rest(self, sym: str, timeframe: str, limit: int) -> Optional[List[list]]:
+        key = (sym, timeframe)
+        cached = self._klines.get(key)
+        missing = 0
+        if cached:
+            missing = int(time.time() * 1000 - int(cached[-1][0])) // timeframe_ms(timeframe) + 1
+        # sin caché, o con un hueco de una ventana o más: lo guardado no sirve, ventana completa
+        # (con since=último ts se recibirían las velas más viejas tras el hueco, no las últimas)
+        if not cached or missing >= limit:
+            rows = await self.exchange.fetch_ohlcv(sym, timeframe=timeframe, limit=limit)
+            if rows:
+                self._klines[key] = rows = rows[-limit:]
+                return rows
+            self._klines.pop(key, None)
+            return None
+        last_ts = int(cached[-1][0])
+        rows = await self.exchange.fetch_ohlcv(sym, timeframe=timeframe, since=last_ts, limit=min(missing + 1, limit))
+        if not rows:
+            return cached
+        merged = [r for r in cached if r[0] < rows[0][0]] + rows
+        self._klines[key] = merged = merged[-limit:]
+        return merged
+
     async def analizar_signal(self, sym: str) -> Optional[str]:
         try:
-            ohlcv_1m = await self.exchange.fetch_ohlcv(sym, timeframe=TIMEFRAME_SIGNAL, limit=50)
-            ohlcv_15m = await self.exchange.fetch_ohlcv(sym, timeframe=TIMEFRAME_TENDENCIA, limit=50)
+            # las tres series son independientes: un solo RTT en lugar de tres seguidos
+            ohlcv_1m, ohlcv_15m, ohlcv_24h = await asyncio.gather(
+                self._fetch_klines(sym, TIMEFRAME_SIGNAL, 50),
+                self._fetch_klines(sym, TIMEFRAME_TENDENCIA, 50),
+                self._fetch_klines(sym, "1d", 2),
+            )
             if not ohlcv_1m or not ohlcv_15m:
                 return None
-            df_1m = pd.DataFrame(ohlcv_1m, columns=["timestamp", "open", "high", "low", "close", "volume"])
-            df_15m = pd.DataFrame(ohlcv_15m, columns=["timestamp", "open", "high", "low", "close", "volume"])
+            price = float(ohlcv_1m[-1][4])
 
-            ema9 = EMAIndicator(df_1m["close"], window=9).ema_indicator().iloc[-1]
-            ema21 = EMAIndicator(df_1m["close"], window=21).ema_indicator().iloc[-1]
-            rsi14 = RSIIndicator(df_1m["close"], window=14).rsi().iloc[-1]
-            ema50_15m = EMAIndicator(df_15m["close"], window=50).ema_indicator().iloc[-1]
-            price = float(df_1m["close"].iloc[-1])
-
-            ohlcv_24h = await self.exchange.fetch_ohlcv(sym, timeframe="1d", limit=2)
+            # filtro barato primero: sin movimiento diario suficiente no se calculan indicadores
             if ohlcv_24h and len(ohlcv_24h) == 2:
                 price_prev = float(ohlcv_24h[0][4])
                 pct_change = abs((price - price_prev) / price_prev * 100)
                 if pct_change < PCT_CHANGE_24H:
                     return None
 
-            if price > ema50_15m and ema9 > ema21 and rsi14 < 65:
-                return "long"
-            if price < ema50_15m and ema9 < ema21 and rsi14 > 35:
-                return "short"
-            return None
+            memo_key = (ohlcv_1m[-1][0], ohlcv_1m[-1][4], len(ohlcv_1m), ohlcv_15m[-1][0], ohlcv_15m[-1][4], len(ohlcv_15m))
+            memo = self._signal_memo.get(sym)
+            if memo is not None and memo[0] == memo_key:
+                return memo[1]
+
+            # EMA9/21 + RSI14 (1m) y EMA50 (15m) en un kernel JIT sobre los closes, sin DataFrames
+            close_1m = np.fromiter((r[4] for r in ohlcv_1m), dtype=np.float64, count=len(ohlcv_1m))
+            close_15m = np.fromiter((r[4] for r in ohlcv_15m), dtype=np.float64, count=len(ohlcv_15m))
+            signal = trend_signal(close_1m, close_15m)
+            self._signal_memo[sym] = (memo_key, signal)
+            return signal
         except Exception as e:
             msg = str(e)
             if "Invalid symbol" in msg or "Invalid symbol status" in msg:
@@ -160,19 +294,31 @@ class CryptoBot:
         qty = risk_usdt / distance
         return qty
 
-    async def ejecutar_trade(self, sym: str, signal: str):
-        if sym in getattr(self.state, "open_positions", {}):
+    async def ejecutar_trade(self, sym: str, signal: str, price: Optional[float] = None):
+        """`price`: último close ya descargado por analizar_signal; si falta se pide al exchange."""
+        open_positions = getattr(self.state, "open_positions", {})
+        # con varios pares en paralelo el tope hay que comprobarlo por entrada, no por ciclo
+        if sym in open_positions or len(open_positions) + self._pending_entries >= MAX_OPERATIONS_SIMULTANEAS:
             return
-
+        # el hueco se reserva antes del primer await: las tareas que comprueban el tope a la vez
+        # ya lo ven ocupado; se libera en todos los caminos (precio, filtros, orden, error)
+        self._pending_entries += 1
         try:
-            ohlcv = await self.exchange.fetch_ohlcv(sym, timeframe=TIMEFRAME_SIGNAL, limit=1)
-            if not ohlcv:
-                await self.safe_send_telegram(f"⚠️ No se pudo obtener precio para {sym}")
+            await self._ejecutar_trade_reservado(sym, signal, price)
+        finally:
+            self._pending_entries -= 1
+
+    async def _ejecutar_trade_reservado(self, sym: str, signal: str, price: Optional[float]):
+        if price is None:
+            try:
+                ohlcv = await self.exchange.fetch_ohlcv(sym, timeframe=TIMEFRAME_SIGNAL, limit=1)
+                if not ohlcv:
+                    await self.safe_send_telegram(f"⚠️ No se pudo obtener precio para {sym}")
+                    return
+                price = float(ohlcv[-1][4])
+            except Exception as e:
+                await self.safe_send_telegram(f"❌ Error obteniendo precio para {sym}: {e}")
                 return
-            price = float(ohlcv[-1][4])
-        except Exception as e:
-            await self.safe_send_telegram(f"❌ Error obteniendo precio para {sym}: {e}")
-            return
 
         # Calculate qty based on mode
         if POSITION_SIZE_MODE == "risk":
@@ -184,22 +330,30 @@ class CryptoBot:
         qty = self.exchange.adjust_amount_to_step(sym, qty)
         notional = qty * price
         if qty <= 0 or notional < MIN_NOTIONAL_USD:
-            await self.safe_send_telegram(f"⚠️ Orden ignorada {sym}: qty {qty:.6f} notional {notional:.2f} < min {MIN_NOTIONAL_USD}")
+            await self._report(f"⚠️ Orden ignorada {sym}: qty {qty:.6f} notional {notional:.2f} < min {MIN_NOTIONAL_USD}")
+            return
+        if not self.exchange.is_trade_feasible(sym, notional, price):
+            # el que falla es el filtro del exchange, no MIN_NOTIONAL_USD: se informa de sus valores
+            f = self.exchange.get_symbol_filters(sym)
+            await self._report(
+                f"⚠️ Orden ignorada {sym}: qty {qty:.6f} notional {notional:.2f} no cumple los filtros del exchange"
+                + (f" (minQty {f.min_qty:g}, minNotional {f.min_notional:g})" if f else "")
+            )
             return
 
         try:
-            meta = await self.scalper.place_scalping_trade(
-                symbol=sym,
-                side=signal,
-                entry_price=price,
-                amount=qty,
-                stop_loss_pct=STOP_LOSS_PCT,
-                rr_ratio=RISK_REWARD_RATIO,
-                tp_timeout=TP_TIMEOUT_SEC,
-                entry_fill_timeout=ENTRY_FILL_TIMEOUT_SEC,
-            )
+            async with self._order_sem:
+                meta = await self.scalper.place_scalping_trade(
+                    symbol=sym,
+                    side=signal,
+                    entry_price=price,
+                    amount=qty,
+                    stop_loss_pct=STOP_LOSS_PCT,
+                    rr_ratio=RISK_REWARD_RATIO,
+                    tp_timeout=TP_TIMEOUT_SEC,
+                    entry_fill_timeout=ENTRY_FILL_TIMEOUT_SEC,
+                )
             if meta.get("entry_order_id"):
-                await self.safe_send_telegram(f"📥 {sym} {signal.upper()} LIMIT @ {price:.6f}\nQty {qty:.6f}\nEntry order id: {meta.get('entry_order_id')}")
                 msgs = []
                 if meta.get("sl_order_id"):
                     msgs.append(f"SL id={meta.get('sl_order_id')} type={meta.get('sl_type')}")
@@ -209,37 +363,73 @@ class CryptoBot:
                     msgs.append(f"TP id={meta.get('tp_order_id')} type={meta.get('tp_type')}")
                 else:
                     msgs.append("TP ❌")
-                await self.safe_send_telegram(" | ".join(msgs))
+                await self._report(
+                    f"📥 {sym} {signal.upper()} LIMIT @ {price:.6f}\nQty {qty:.6f}\nEntry order id: {meta.get('entry_order_id')}\n"
+                    + " | ".join(msgs)
+                )
             else:
                 await self.safe_send_telegram(f"❌ Entry order for {sym} could not be placed.")
         except Exception as e:
             logger.exception("Error placing scalping trade for %s: %s", sym, e)
             await self.safe_send_telegram(f"❌ Error placing scalping trade for {sym}: {e}")
 
+    def _free_slots(self) -> int:
+        """Entradas que aún caben: tope menos posiciones abiertas y entradas colocándose."""
+        return MAX_OPERATIONS_SIMULTANEAS - len(getattr(self.state, "open_positions", {})) - self._pending_entries
+
     async def procesar_par(self, sym: str):
-        signal = await self.analizar_signal(sym)
-        if signal:
-            await self.ejecutar_trade(sym, signal)
+        lock = self._symbol_locks.setdefault(sym, asyncio.Lock())
+        if lock.locked():
+            return  # el par sigue procesándose desde el ciclo anterior
+        # cupo agotado a mitad de ciclo: el resto de pares ni se analiza (la entrada se rechazaría)
+        if self._free_slots() <= 0:
+            return
+        async with lock:
+            signal = await self.analizar_signal(sym)
+            if signal:
+                # la serie 1m recién actualizada ya trae el precio: sin otro fetch de 1 vela,
+                # solo si su última vela es la actual (si no, ejecutar_trade pide el precio)
+                bars = self._klines.get((sym, TIMEFRAME_SIGNAL))
+                price = None
+                if bars and time.time() * 1000 - bars[-1][0] < timeframe_ms(TIMEFRAME_SIGNAL):
+                    price = float(bars[-1][4])
+                await self.ejecutar_trade(sym, signal, price)
 
     async def run_trading_loop(self):
         while not self._stop_event.is_set():
             self.last_loop_heartbeat = datetime.now(timezone.utc)
             self.state.reset_daily_if_needed()
 
-            if not getattr(self.state, "can_open_new_trade", lambda: True)() or \
-               len(getattr(self.state, "open_positions", {})) >= MAX_OPERATIONS_SIMULTANEAS:
+            if not getattr(self.state, "can_open_new_trade", lambda: True)() or self._free_slots() <= 0:
                 await asyncio.sleep(5)
                 continue
             if not self.symbols:
                 await asyncio.sleep(2)
                 continue
 
-            CHUNK = 8
-            for i in range(0, len(self.symbols), CHUNK):
-                batch = self.symbols[i:i+CHUNK]
-                tasks = [self.procesar_par(sym) for sym in batch]
-                await asyncio.gather(*tasks, return_exceptions=True)
-                await asyncio.sleep(0.5)
+            # todos los pares en vuelo a la vez (acotado por el semáforo), sin pausas entre lotes
+            sem = asyncio.Semaphore(SYMBOL_CONCURRENCY)
+
+            async def _guarded(sym: str):
+                async with sem:
+                    await self.procesar_par(sym)
+
+            self._cycle_msgs = []
+            symbols = self.symbols
+            try:
+                results = await asyncio.gather(*(_guarded(sym) for sym in symbols), return_exceptions=True)
+                # un solo resumen por ciclo con los pares que fallaron (antes se descartaban en silencio)
+                failed = [(sym, res) for sym, res in zip(symbols, results) if isinstance(res, Exception)]
+                if failed:
+                    logger.error(
+                        "Cycle: %d/%d symbols failed: %s", len(failed), len(symbols),
+                        "; ".join("%s: %r" % f for f in failed),
+                    )
+            finally:
+                # entradas y avisos del ciclo en un solo mensaje (errores ya salieron al momento)
+                msgs, self._cycle_msgs = self._cycle_msgs, None
+                if msgs:
+                    await self.safe_send_telegram("\n\n".join(msgs))
             await asyncio.sleep(1)
 
     async def monitor_order_fills(self, poll_interval: float = 2.0):
@@ -313,9 +503,15 @@ class CryptoBot:
                 logger.exception("Error computing pnl from trades for %s %s %s: %s", sym, entry_order_id, close_order_id, e)
                 return None, None
 
+        # drift-free cadence: next tick is anchored to the schedule, not to when the work ended
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         while True:
             try:
                 open_positions = self.state.get_open_positions().copy()
+                # closures of this pass are reported in a single Telegram message afterwards
+                closed_msgs: List[str] = []
+                closed_pnls: List[float] = []
                 for sym, pos in list(open_positions.items()):
                     entry_id = pos.get("entry_order_id")
                     sl_id = pos.get("sl_order_id")
@@ -332,12 +528,7 @@ class CryptoBot:
                     if entry_id:
                         order = await self.exchange.fetch_order(entry_id, sym)
                         if order:
-                            filled = float(order.get("filled") or order.get("info", {}).get("executedQty") or 0.0)
-                            avg = order.get("average") or order.get("info", {}).get("avgPrice")
-                            try:
-                                avg = float(avg) if avg is not None else None
-                            except Exception:
-                                avg = None
+                            filled, avg = _order_fill_info(order)
                             if filled and filled != entry_filled:
                                 self.state.update_entry_execution(sym, filled, avg or entry_price)
                                 await self.safe_send_telegram(f"✳️ {sym} ENTRY ejecutada {side.upper()} qty={filled:.6f} avg={avg or entry_price:.6f}")
@@ -378,12 +569,7 @@ class CryptoBot:
                         order = await self.exchange.fetch_order(order_id, sym)
                         if not order:
                             return False
-                        filled = float(order.get("filled") or order.get("info", {}).get("executedQty") or 0.0)
-                        avg = order.get("average") or order.get("info", {}).get("avgPrice")
-                        try:
-                            avg = float(avg) if avg is not None else None
-                        except Exception:
-                            avg = None
+                        filled, avg = _order_fill_info(order)
                         if filled <= 0:
                             return False
 
@@ -414,15 +600,16 @@ class CryptoBot:
                                 logger.debug("Cancel of opposite order failed for %s: %s", sym, opp_id)
                         pos["closed"] = True
                         self.state.open_positions.pop(sym, None)
+                        closed_pnls.append(float(pnl))
                         if pnl_details:
-                            await self.safe_send_telegram(
+                            closed_msgs.append(
                                 f"🏁 {sym} cerrada por {reason_label}. PnL: {pnl:.2f} USDT | Qty: {pnl_details.get('qty_closed', 0.0):.6f} | Entry cost {pnl_details.get('entry_cost', 0.0):.6f} -> Close cost {pnl_details.get('close_cost', 0.0):.6f} | Fees {pnl_details.get('fees', 0.0):.6f}"
                             )
                         else:
                             if reason_label == "TP":
-                                await self.safe_send_telegram(f"🏁 {sym} cerrada por TP. PnL: {pnl:.2f} USDT | Qty: {filled:.6f} | Entry {pos.get('entry_avg') or pos.get('entry'):.6f} -> Close {close_price}")
+                                closed_msgs.append(f"🏁 {sym} cerrada por TP. PnL: {pnl:.2f} USDT | Qty: {filled:.6f} | Entry {pos.get('entry_avg') or pos.get('entry'):.6f} -> Close {close_price}")
                             else:
-                                await self.safe_send_telegram(f"🔒 {sym} cerrada por SL. PnL: {pnl:.2f} USDT | Qty: {filled:.6f} | Entry {pos.get('entry_avg') or pos.get('entry'):.6f} -> Close {close_price}")
+                                closed_msgs.append(f"🔒 {sym} cerrada por SL. PnL: {pnl:.2f} USDT | Qty: {filled:.6f} | Entry {pos.get('entry_avg') or pos.get('entry'):.6f} -> Close {close_price}")
                         return True
 
                     # 2) Procesar SL primero, luego TP
@@ -436,12 +623,28 @@ class CryptoBot:
                         if tp_triggered:
                             continue
 
-                await asyncio.sleep(poll_interval)
+                if closed_msgs:
+                    pnl_pass = sum(closed_pnls)
+                    pnl_day = self.state.realized_pnl_today
+                    closed_msgs.append(f"📊 {len(closed_pnls)} cierre(s): PnL {pnl_pass:.2f} USDT | PnL diario: {pnl_day:.2f} USDT")
+                    # daily target is evaluated once per pass, not once per closed position
+                    if pnl_day >= DAILY_PROFIT_TARGET and pnl_day - pnl_pass < DAILY_PROFIT_TARGET:
+                        closed_msgs.append(f"🎯 Objetivo diario alcanzado ({pnl_day:.2f} USDT). No se abrirán nuevas operaciones.")
+                    await self.safe_send_telegram("\n".join(closed_msgs))
+
+                next_tick += poll_interval
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    # fell behind (slow REST calls): resync instead of bursting to catch up
+                    next_tick = loop.time()
+                    delay = 0
+                await asyncio.sleep(delay)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.exception("Error en monitor_order_fills: %s", e)
                 await asyncio.sleep(5)
+                next_tick = loop.time()
 
 
 # Aux loops
@@ -492,6 +695,7 @@ async def main():
                 await t
             except asyncio.CancelledError:
                 pass
+        bot.stop_streams()
         try:
             await bot.exchange.close()
         except Exception:
@@ -500,6 +704,13 @@ async def main():
             await bot.telegram.close()
         except Exception:
             pass
+        # sesión HTTP compartida por todos los notificadores de Telegram: se cierra una vez, al final
+        await close_telegram_session()
 
 if __name__ == "__main__":
+    try:
+        import uvloop  # loop libuv: menos overhead por callback en fetch/monitor loops
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())